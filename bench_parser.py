@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import robot
+
+
+def write_big_file(path, M, N, nb_instances, density, seed):
+    """
+    Écrit nb_instances grilles MxN aléatoires (proportion density
+    d'obstacles) au format d'entrée, suivies de la ligne "0 0".
+    """
+    rng = random.Random(seed)
+    with open(path, "w") as f:
+        for _ in range(nb_instances):
+            f.write(f"{M} {N}\n")
+            for _ in range(M):
+                f.write(" ".join("1" if rng.random() < density else "0" for _ in range(N)) + "\n")
+            f.write(f"1 1 {M - 1} {N - 1} nord\n")
+        f.write("0 0\n")
+
+
+def time_reader(read, path, repeat):
+    """Meilleur temps (s) sur repeat lectures complètes du fichier."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = read(path)
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best, result
+
+
+def read_text(path):
+    with open(path) as f:
+        return list(robot.iter_instances(f))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare le lecteur d'origine et le lecteur rapide.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 1000, 2000],
+                        help="tailles M = N des grilles générées")
+    parser.add_argument("--instances", type=int, default=2, help="instances par fichier")
+    parser.add_argument("--density", type=float, default=0.1, help="proportion d'obstacles")
+    parser.add_argument("--repeat", type=int, default=3, help="répétitions par mesure")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'M=N':>6}  {'cases':>10}  {'origine (s)':>12}  {'rapide (s)':>11}  {'gain':>6}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            path = os.path.join(tmp, f"bench_{size}.txt")
+            write_big_file(path, size, size, args.instances, args.density, args.seed)
+
+            t_ref, ref = time_reader(read_text, path, args.repeat)
+            t_fast, fast = time_reader(robot.read_input_fast, path, args.repeat)
+
+            # Les deux lecteurs doivent produire les mêmes instances
+            assert len(ref) == len(fast)
+            for a, b in zip(ref, fast):
+                assert a[:2] == b[:2] and a[3:] == b[3:]
+                assert all(list(rb) == ra for ra, rb in zip(a[2], b[2]))
+
+            cells = size * size * args.instances
+            print(f"{size:6d}  {cells:10d}  {t_ref:12.3f}  {t_fast:11.3f}  {t_ref / t_fast:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
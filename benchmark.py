@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+import argparse
+import csv
+import io
+import json
+import platform
+import random
+import sys
+import time
+from statistics import mean, stdev
+
+import robot
+
+ORIENTATIONS = ["nord", "sud", "est", "ouest"]
+
+
+# Conversion des cases 0 / 1 en caractères "0" / "1" (cf. robot._ASCII_TO_CELL)
+_CELL_TO_ASCII = bytes.maketrans(b"\x00\x01", b"01")
+
+# Nombre de tirages à partir duquel generate_instance passe par numpy
+# (s'il est installé) : en dessous, les instances d'une graine ne dépendent
+# pas de sa présence
+NUMPY_SAMPLE_MIN = 1 << 16
+
+
+def generate_instance(M, N, P, rng=random, ensure_ok=False):
+    """
+    Génère UNE instance :
+      - grille MxN avec P obstacles,
+      - départ (D1,D2), arrivée (F1,F2),
+      - orientation initiale.
+
+    Départ et arrivée sont strictement à l'intérieur :
+      1 <= D1 <= M-2, 1 <= D2 <= N-2, idem pour F1,F2.
+
+    Les obstacles ne sont jamais sur les cases (D1,D2) et (F1,F2) ; avec
+    ensure_ok, ils évitent les 4 cases autour de chacun des deux sommets,
+    qui vérifient alors robot.vertex_ok.
+
+    La grille est une liste de M bytearray (cases 0 / 1), découpée dans un
+    tampon plat : les cases d'obstacle (ou les cases libres, s'il y en a
+    moins) sont tirées sans remise sur les indices de cases, sans rejet ni
+    ensemble intermédiaire de couples. Au-delà de NUMPY_SAMPLE_MIN tirages,
+    et si numpy est installé, le tirage et le remplissage sont vectorisés
+    (générateur numpy initialisé depuis rng) ; sinon rng.sample.
+
+    rng est le générateur utilisé (random.Random(graine) pour des instances
+    reproductibles ; le module random par défaut).
+    """
+    if M < 3 or N < 3:
+        raise ValueError("La grille doit être au moins 3x3.")
+
+    # Départ à l'intérieur
+    D1 = rng.randrange(1, M - 1)
+    D2 = rng.randrange(1, N - 1)
+
+    # Arrivée à l'intérieur, différente du départ
+    while True:
+        F1 = rng.randrange(1, M - 1)
+        F2 = rng.randrange(1, N - 1)
+        if (F1, F2) != (D1, D2):
+            break
+
+    # Cases qui doivent rester libres (indices i * N + j)
+    if ensure_ok:
+        forbidden = {r * N + c for i, j in ((D1, D2), (F1, F2))
+                     for r in (i - 1, i) for c in (j - 1, j)}
+    else:
+        forbidden = {D1 * N + D2, F1 * N + F2}
+    free = M * N - len(forbidden)
+    if P > free:
+        raise ValueError(f"Trop d'obstacles : il faut laisser au moins {len(forbidden)} cases libres.")
+
+    # On tire le plus petit des deux ensembles : obstacles ou cases libres
+    if P <= free // 2:
+        flat = bytearray(M * N)
+        value, k = 1, P
+    else:
+        flat = bytearray(b"\x01") * (M * N)
+        for c in forbidden:
+            flat[c] = 0
+        value, k = 0, free - P
+
+    # k + |forbidden| indices distincts, dans un ordre aléatoire : les k
+    # premiers hors de forbidden forment un tirage uniforme parmi les
+    # cases autorisées
+    n_samples = k + len(forbidden)
+    np = None
+    if n_samples >= NUMPY_SAMPLE_MIN:
+        try:
+            import numpy as np
+        except ImportError:
+            pass
+    if np is None:
+        picked = 0
+        for c in rng.sample(range(M * N), n_samples):
+            if picked == k:
+                break
+            if c in forbidden:
+                continue
+            flat[c] = value
+            picked += 1
+    else:
+        np_rng = np.random.default_rng(rng.getrandbits(64))
+        cells = np_rng.choice(M * N, n_samples, replace=False)
+        cells = cells[~np.isin(cells, list(forbidden))][:k]
+        buf = np.frombuffer(flat, dtype=np.uint8)
+        buf[cells] = value
+        del buf     # libère le tampon de flat avant de le découper
+
+    grid = [flat[i * N:(i + 1) * N] for i in range(M)]
+    orientation = rng.choice(ORIENTATIONS)
+    return M, N, grid, (D1, D2), (F1, F2), orientation
+
+
+def write_instance_block(f, M, N, grid, start, end, orientation):
+    """
+    Écrit UNE instance dans le fichier d'entrée, SANS la ligne terminale "0 0".
+    Format :
+      M N
+      <M lignes de N entiers 0/1>
+      D1 D2 F1 F2 orientation
+
+    La grille (lignes bytearray / bytes ou listes de 0 / 1) est écrite ligne
+    par ligne, sans la joindre en mémoire : dans chaque ligne, les chiffres
+    et les séparateurs sont entrelacés par affectation de tranches, sans
+    boucle Python par case. f peut être un fichier binaire (le plus rapide)
+    ou texte.
+    """
+    D1, D2 = start
+    F1, F2 = end
+
+    text_mode = isinstance(f, io.TextIOBase)
+    line = bytearray(2 * N)
+    line[1::2] = b" " * (N - 1) + b"\n"
+    f.write(f"{M} {N}\n" if text_mode else f"{M} {N}\n".encode("ascii"))
+    for row in grid:
+        line[0::2] = bytes(row).translate(_CELL_TO_ASCII)
+        f.write(line.decode("ascii") if text_mode else line)
+    tail = f"{D1} {D2} {F1} {F2} {orientation}\n"
+    f.write(tail if text_mode else tail.encode("ascii"))
+
+
+# Moteurs mesurables : nom -> fonction (grid, D1, D2, o, F1, F2). Pour les
+# moteurs de robot.ENGINES, la construction des GridTables fait partie du
+# temps mesuré, pour comparer à robot.bfs à travail égal.
+def _table_engine(engine):
+    return lambda grid, *args: engine(robot.GridTables(grid), *args)
+
+
+BENCH_ENGINES = {"ref": robot.bfs}
+BENCH_ENGINES.update((name, _table_engine(fn)) for name, fn in robot.ENGINES.items())
+
+
+def sweep(Ms, Ns, obstacles=None, densities=None):
+    """
+    Configurations (M, N, P) du produit cartésien des tailles et, soit des
+    nombres d'obstacles P, soit des densités (P = densité * M * N).
+    """
+    configs = []
+    for M in Ms:
+        for N in Ns:
+            if densities is not None:
+                Ps = [int(d * M * N) for d in densities]
+            else:
+                Ps = obstacles if obstacles is not None else [N]
+            configs.extend((M, N, P) for P in Ps)
+    return configs
+
+
+def run(configs, engines=("ref",), nb_instances=10, seed=0, warmup=1, repeats=3,
+        input_path=None, results_path=None, ensure_ok=False):
+    """
+    Mesure chaque moteur sur nb_instances instances par configuration
+    (M, N, P). Les instances sont générées avec random.Random(seed) (seed
+    None : non reproductible) et partagées par tous les moteurs ; ensure_ok
+    est passé à generate_instance.
+
+    Pour chaque moteur et chaque configuration, warmup appels non mesurés
+    précèdent les mesures ; chaque instance est ensuite résolue repeats fois.
+
+    Si input_path / results_path sont donnés, les instances et les
+    résultats du premier moteur y sont écrits (formats de robot.py).
+
+    Retourne la liste des mesures : un dict par (moteur, instance).
+    """
+    rng = random.Random(seed)
+    records = []
+    f_in = open(input_path, "wb") if input_path else None
+    f_out = open(results_path, "w") if results_path else None
+    try:
+        for M, N, P in configs:
+            instances = [generate_instance(M, N, P, rng, ensure_ok) for _ in range(nb_instances)]
+            if f_in is not None:
+                for inst in instances:
+                    write_instance_block(f_in, *inst)
+
+            for k, name in enumerate(engines):
+                solve = BENCH_ENGINES[name]
+                for _ in range(warmup):
+                    _, _, grid, (D1, D2), (F1, F2), ori = instances[0]
+                    solve(grid, D1, D2, robot.ORI_STR_TO_ID[ori], F1, F2)
+
+                for n, (_, _, grid, (D1, D2), (F1, F2), ori) in enumerate(instances):
+                    o = robot.ORI_STR_TO_ID[ori]
+                    times = []
+                    for _ in range(repeats):
+                        t0 = time.perf_counter()
+                        cmds = solve(grid, D1, D2, o, F1, F2)
+                        times.append(time.perf_counter() - t0)
+                    if k == 0 and f_out is not None:
+                        f_out.write(robot.format_result(cmds) + "\n")
+                    records.append({
+                        "engine": name, "M": M, "N": N, "P": P, "instance": n,
+                        "length": -1 if cmds is None else len(cmds),
+                        "best_ms": min(times) * 1000,
+                        "mean_ms": mean(times) * 1000,
+                    })
+        if f_in is not None:
+            f_in.write(b"0 0\n")
+    finally:
+        for f in (f_in, f_out):
+            if f is not None:
+                f.close()
+    return records
+
+
+def summarize(records):
+    """
+    Temps moyen et écart-type (ms, sur les instances, à partir de best_ms)
+    par (moteur, M, N, P), dans l'ordre des mesures.
+    """
+    groups = {}
+    for r in records:
+        groups.setdefault((r["engine"], r["M"], r["N"], r["P"]), []).append(r["best_ms"])
+    summary = []
+    for (engine, M, N, P), times in groups.items():
+        summary.append({
+            "engine": engine, "M": M, "N": N, "P": P,
+            "mean_ms": mean(times),
+            "stdev_ms": stdev(times) if len(times) > 1 else 0.0,
+        })
+    return summary
+
+
+def print_summary(summary, title=None, file=sys.stdout):
+    if title:
+        print(f"\n=== {title} ===", file=file)
+    print(f"{'moteur':>8}  {'M':>5}  {'N':>5}  {'P':>7}  {'moyen (ms)':>12}  {'écart-type (ms)':>16}",
+          file=file)
+    for s in summary:
+        print(f"{s['engine']:>8}  {s['M']:5d}  {s['N']:5d}  {s['P']:7d}  "
+              f"{s['mean_ms']:12.3f}  {s['stdev_ms']:16.3f}", file=file)
+
+
+def write_json(path, records, meta):
+    with open(path, "w") as f:
+        json.dump({"meta": meta, "records": records}, f, indent=1)
+
+
+def write_csv(path, records):
+    fields = ["engine", "M", "N", "P", "instance", "length", "best_ms", "mean_ms"]
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(records)
+
+
+def plot(summary, path, x="N", title=None):
+    """
+    Courbes temps moyen / écart-type en fonction du paramètre x ("M", "N"
+    ou "P"), une par moteur, enregistrées dans path sans ouvrir de fenêtre
+    (backend Agg, utilisable sur un serveur ou en CI).
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    labels = {"M": "Nombre de lignes M", "N": "Taille de la grille N", "P": "Nombre d'obstacles P"}
+    fig = plt.figure()
+    for engine in dict.fromkeys(s["engine"] for s in summary):
+        points = sorted((s[x], s["mean_ms"], s["stdev_ms"]) for s in summary if s["engine"] == engine)
+        xs, ys, es = zip(*points)
+        plt.errorbar(xs, ys, yerr=es, fmt="-o", capsize=5, label=engine)
+    if title:
+        plt.title(title)
+    plt.xlabel(labels[x])
+    plt.ylabel("Temps moyen (ms)")
+    plt.grid(True)
+    plt.legend()
+    fig.savefig(path)
+    plt.close(fig)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Banc de mesure des moteurs de robot.py.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 20, 30, 40, 50],
+                        help="tailles des grilles carrées (ignoré si --M / --N sont donnés)")
+    parser.add_argument("--M", type=int, nargs="+", help="nombres de lignes")
+    parser.add_argument("--N", type=int, nargs="+", help="nombres de colonnes")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--obstacles", type=int, nargs="+",
+                       help="nombres d'obstacles P (défaut : P = N)")
+    group.add_argument("--densities", type=float, nargs="+",
+                       help="proportions d'obstacles (P = densité * M * N)")
+    parser.add_argument("--engines", nargs="+", default=["ref"], choices=sorted(BENCH_ENGINES),
+                        help="moteurs mesurés (ref = robot.bfs)")
+    parser.add_argument("--instances", type=int, default=10, help="instances par configuration")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--warmup", type=int, default=1, help="appels non mesurés par moteur")
+    parser.add_argument("--repeats", type=int, default=3, help="mesures par instance")
+    parser.add_argument("--ensure-ok", action="store_true",
+                        help="départ et arrivée toujours entourés de cases libres")
+    parser.add_argument("--entree", metavar="FICHIER", help="écrit les instances générées")
+    parser.add_argument("--resultats", metavar="FICHIER",
+                        help="écrit les résultats du premier moteur")
+    parser.add_argument("--json", metavar="FICHIER", help="écrit toutes les mesures en JSON")
+    parser.add_argument("--csv", metavar="FICHIER", help="écrit toutes les mesures en CSV")
+    parser.add_argument("--plot", metavar="FICHIER", help="enregistre un graphique (matplotlib)")
+    parser.add_argument("--x", choices=["M", "N", "P"], default="N", help="abscisse du graphique")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    Ms = args.M or args.sizes
+    Ns = args.N or args.sizes
+    if args.M is None and args.N is None:
+        configs = [(s, s, P) for s in args.sizes
+                   for (_, _, P) in sweep([s], [s], args.obstacles, args.densities)]
+    else:
+        configs = sweep(Ms, Ns, args.obstacles, args.densities)
+
+    records = run(configs, args.engines, args.instances, args.seed, args.warmup, args.repeats,
+                  input_path=args.entree, results_path=args.resultats, ensure_ok=args.ensure_ok)
+    summary = summarize(records)
+    print_summary(summary)
+
+    meta = {
+        "seed": args.seed, "warmup": args.warmup, "repeats": args.repeats,
+        "instances": args.instances, "engines": args.engines,
+        "python": platform.python_version(), "platform": platform.platform(),
+    }
+    if args.json:
+        write_json(args.json, records, meta)
+    if args.csv:
+        write_csv(args.csv, records)
+    if args.plot:
+        plot(summary, args.plot, x=args.x)
+
+
+if __name__ == "__main__":
+    main()
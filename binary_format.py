@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+import argparse
+import mmap
+import os
+import struct
+from array import array
+
+import robot
+
+# En-tête du fichier : magie, version, drapeaux (réservés, toujours 0),
+# nombre d'instances, position de l'index
+MAGIC = robot.BINARY_MAGIC
+VERSION = 1
+HEADER = struct.Struct("<4sHHQQ")
+# En-tête d'une instance : M, N, D1, D2, F1, F2, orientation (indice). Les
+# extrémités sont signées : une instance dont le départ ou l'arrivée sort
+# de la grille (robot.py répond -1) reste représentable
+RECORD = struct.Struct("<IIiiiiB")
+
+# Cases 0 / 1 <-> caractères "0" / "1" (pour passer par int(..., 2))
+_CELL_TO_ASCII = bytes.maketrans(b"\x00\x01", b"01")
+
+
+def pack_row(row, N):
+    """
+    Rangée de N cases (bytes 0 / 1 ou liste d'entiers) -> (N + 7) // 8
+    octets, la colonne j étant le bit j (poids faible du premier octet en
+    premier).
+    """
+    bits = bytes(row).translate(_CELL_TO_ASCII)[::-1]
+    return int(bits or b"0", 2).to_bytes((N + 7) // 8, "little")
+
+
+def unpack_row(data, N):
+    """Inverse de pack_row : bytes de N cases 0 / 1."""
+    bits = format(int.from_bytes(data, "little"), f"0{N}b")[::-1]
+    return bits[:N].encode().translate(robot._ASCII_TO_CELL)
+
+
+class BinaryWriter:
+    """
+    Écrit un conteneur binaire d'instances :
+      - en-tête HEADER (magie, version, drapeaux réservés à 0, nombre
+        d'instances, position de l'index), réécrit à la fermeture,
+      - pour chaque instance : RECORD puis M rangées de (N + 7) // 8 octets
+        (une case par bit),
+      - à la fin, l'index : un entier 64 bits par instance, position de son
+        RECORD dans le fichier.
+    À utiliser comme gestionnaire de contexte (with BinaryWriter(path) as w).
+    """
+
+    def __init__(self, path):
+        self.f = open(path, "wb")
+        self.offsets = array("Q")
+        self.f.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0))
+
+    def write(self, M, N, grid, D1, D2, F1, F2, ori_str):
+        self.offsets.append(self.f.tell())
+        self.f.write(RECORD.pack(M, N, D1, D2, F1, F2, robot.ORI_STR_TO_ID[ori_str]))
+        self.f.write(b"".join(pack_row(row, N) for row in grid))
+
+    def close(self):
+        if self.f.closed:
+            return
+        index_offset = self.f.tell()
+        self.f.write(self.offsets.tobytes())
+        self.f.seek(0)
+        self.f.write(HEADER.pack(MAGIC, VERSION, 0, len(self.offsets), index_offset))
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class BinaryCorpus:
+    """
+    Lecture d'un conteneur écrit par BinaryWriter, via un mmap : seul
+    l'en-tête est lu à l'ouverture ; l'index est une vue sur le mmap, et une
+    instance n'est décodée que lorsqu'on y accède (corpus[k]), sans lire les
+    instances qui la précèdent.
+
+    corpus[k] retourne le même tuple que robot.iter_instances_fast
+    (M, N, grid, D1, D2, F1, F2, ori_str), grid étant une liste de bytes.
+    """
+
+    def __init__(self, path):
+        self.f = open(path, "rb")
+        self.mm = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _flags, count, index_offset = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} : pas un conteneur d'instances binaire")
+        if version != VERSION:
+            self.close()
+            raise ValueError(f"{path} : version {version} non prise en charge")
+        self.count = count
+        self.index = memoryview(self.mm)[index_offset:index_offset + 8 * count].cast("Q")
+
+    def __len__(self):
+        return self.count
+
+    def header(self, k):
+        """(M, N, D1, D2, F1, F2, ori_str) de l'instance k, sans sa grille."""
+        M, N, D1, D2, F1, F2, o = RECORD.unpack_from(self.mm, self.index[k])
+        return M, N, D1, D2, F1, F2, robot.ORI_ID_TO_STR[o]
+
+    def __getitem__(self, k):
+        if k < 0:
+            k += self.count
+        if not 0 <= k < self.count:
+            raise IndexError(k)
+        offset = self.index[k]
+        M, N, D1, D2, F1, F2, ori_str = self.header(k)
+        row_bytes = (N + 7) // 8
+        start = offset + RECORD.size
+        mm = self.mm
+        grid = [unpack_row(mm[start + i * row_bytes:start + (i + 1) * row_bytes], N)
+                for i in range(M)]
+        return (M, N, grid, D1, D2, F1, F2, ori_str)
+
+    def __iter__(self):
+        for k in range(self.count):
+            yield self[k]
+
+    def iter_range(self, start=0, stop=None):
+        """Instances start..stop-1 (stop None : jusqu'à la fin)."""
+        stop = self.count if stop is None else min(stop, self.count)
+        for k in range(start, stop):
+            yield self[k]
+
+    def close(self):
+        if getattr(self, "index", None) is not None:
+            self.index.release()
+            self.index = None
+        self.mm.close()
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Test de signature, défini dans robot pour que robot.py n'ait pas à
+# importer ce module pour une entrée texte
+is_binary = robot.is_binary
+
+
+def convert_text(src, dst):
+    """
+    Convertit le fichier d'instances texte src (format de robot.py) en
+    conteneur binaire dst, en flux. Retourne le nombre d'instances.
+    """
+    with open(src, "rb") as f, BinaryWriter(dst) as w:
+        source = f
+        if os.fstat(f.fileno()).st_size > 0:
+            source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            for inst in robot.iter_instances_fast(source):
+                w.write(*inst)
+        finally:
+            if source is not f:
+                source.close()
+        return len(w.offsets)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convertit un fichier d'instances texte en conteneur binaire.")
+    parser.add_argument("source", help="fichier d'instances texte")
+    parser.add_argument("destination", help="conteneur binaire à écrire")
+    args = parser.parse_args()
+    n = convert_text(args.source, args.destination)
+    size_src = os.path.getsize(args.source)
+    size_dst = os.path.getsize(args.destination)
+    print(f"{n} instances : {size_src} -> {size_dst} octets")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+import argparse
+import random
+import sys
+import time
+from statistics import mean
+
+import benchmark
+import robot
+
+
+def reach_masks(tables):
+    """
+    Masques de passage par rangée, dérivés de la table reach d'une
+    GridTables (donc des règles de vertex_ok / edge_ok) :
+    masks[n][o][i] est l'entier dont le bit j vaut 1 si l'avance de n
+    sommets dans la direction o est légale depuis (i, j).
+    """
+    M, W = tables.M, tables.W
+    reach = tables.reach
+    masks = {n: [[0] * (M + 1) for _ in range(4)] for n in (1, 2, 3)}
+    for i in range(M + 1):
+        base = i * W * 4
+        for o in range(4):
+            # Chaîne binaire de la rangée, bit de poids faible = colonne 0
+            r = reach[base + o:base + W * 4:4]
+            for n in (1, 2, 3):
+                bits = "".join("1" if x >= n else "0" for x in reversed(r))
+                masks[n][o][i] = int(bits, 2)
+    return masks
+
+
+def expand_layer(frontier, masks):
+    """
+    Développe une couche : frontier[o] est un dict {i: entier de bits} des
+    rangées non vides de la frontière pour l'orientation o. Retourne la
+    couche suivante (avant retrait des états déjà vus), au même format.
+      - G / D : la rangée passe telle quelle à l'orientation voisine,
+      - est / ouest : décalage des bits de n positions,
+      - nord / sud : la rangée (masquée) est reportée n rangées plus loin.
+    """
+    new = [{}, {}, {}, {}]
+
+    def add(o, i, bits):
+        if bits:
+            new[o][i] = new[o].get(i, 0) | bits
+
+    for o in range(4):
+        g = (o - 1) % 4     # G depuis o mène à o-1
+        d = (o + 1) % 4     # D depuis o mène à o+1
+        for i, bits in frontier[o].items():
+            add(g, i, bits)
+            add(d, i, bits)
+            for n in (1, 2, 3):
+                src = bits & masks[n][o][i]
+                if not src:
+                    continue
+                if o == 0:
+                    add(0, i - n, src)
+                elif o == 1:
+                    add(1, i, src << n)
+                elif o == 2:
+                    add(2, i + n, src)
+                else:
+                    add(3, i, src >> n)
+    return new
+
+
+def bfs_bitset(tables, start_i, start_j, start_o, goal_i, goal_j, stats=None):
+    """
+    BFS par couches en pur Python où chaque rangée de sommets d'une
+    orientation est un entier utilisé comme ensemble de bits : une couche
+    entière est développée par des décalages et des ET avec les masques de
+    reach_masks, sans dépendance à NumPy.
+
+    Les couches successives sont conservées pour reconstruire le chemin.
+    Même signature et même résultat (séquence de longueur minimale, ou
+    None) que les moteurs de robot.ENGINES ; stats : cf.
+    robot.record_layer_stats.
+    """
+    if not robot.endpoints_ok(tables, start_i, start_j, goal_i, goal_j):
+        return None
+
+    if stats is not None:
+        t0 = time.perf_counter()
+    M = tables.M
+    masks = reach_masks(tables)
+    visited = [[0] * (M + 1) for _ in range(4)]
+    visited[start_o][start_i] = 1 << start_j
+
+    frontier = [{}, {}, {}, {}]
+    frontier[start_o][start_i] = 1 << start_j
+    layers = [frontier]
+    goal_bit = 1 << goal_j
+
+    expanded = 0
+    peak = 1
+    while not any(frontier[o].get(goal_i, 0) & goal_bit for o in range(4)):
+        if stats is not None:
+            size = sum(bin(b).count("1") for f in frontier for b in f.values())
+            expanded += size
+            peak = max(peak, size)
+
+        new = expand_layer(frontier, masks)
+        empty = True
+        for o in range(4):
+            seen = visited[o]
+            rows = new[o]
+            for i in list(rows):
+                bits = rows[i] & ~seen[i]
+                if bits:
+                    seen[i] |= bits
+                    rows[i] = bits
+                    empty = False
+                else:
+                    del rows[i]
+        if empty:
+            frontier = None
+            break
+        frontier = new
+        layers.append(frontier)
+
+    if stats is not None:
+        # Entiers des couches conservées et des ensembles visités
+        memory = (sum(sys.getsizeof(b) for layer in layers for f in layer for b in f.values())
+                  + sum(sys.getsizeof(b) for rows in visited for b in rows))
+        robot.record_layer_stats(stats, t0, expanded, peak,
+                                 sum(bin(b).count("1") for rows in visited for b in rows), memory)
+        t1 = time.perf_counter()
+    if frontier is None:
+        return None
+
+    goal_o = next(o for o in range(4) if frontier[o].get(goal_i, 0) & goal_bit)
+    commands = recover_path(layers, masks, goal_i, goal_j, goal_o)
+    if stats is not None:
+        stats.path_time = time.perf_counter() - t1
+    return commands
+
+
+def recover_path(layers, masks, i, j, o):
+    """
+    Remonte les couches depuis l'état (i, j, o) de la dernière couche, en
+    choisissant à chaque fois un prédécesseur présent dans la couche
+    précédente.
+    """
+    def in_layer(layer, o, i, j):
+        return j >= 0 and (layer[o].get(i, 0) >> j) & 1
+
+    commands = []
+    for d in range(len(layers) - 1, 0, -1):
+        prev = layers[d - 1]
+        if in_layer(prev, (o + 1) % 4, i, j):
+            commands.append("G")
+            o = (o + 1) % 4
+            continue
+        if in_layer(prev, (o - 1) % 4, i, j):
+            commands.append("D")
+            o = (o - 1) % 4
+            continue
+        di, dj = robot.DIRS[o]
+        for n in (1, 2, 3):
+            pi = i - n * di
+            pj = j - n * dj
+            if in_layer(prev, o, pi, pj) and (masks[n][o][pi] >> pj) & 1:
+                commands.append(f"a{n}")
+                i, j = pi, pj
+                break
+        else:
+            raise RuntimeError("aucun prédécesseur dans la couche précédente")
+    commands.reverse()
+    return commands
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare bfs, bfs_fast et bfs_bitset.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 20, 30, 40, 50],
+                        help="tailles N des grilles (P = N obstacles, comme experiences_Qc.py)")
+    parser.add_argument("--instances", type=int, default=10, help="instances par taille")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    engines = [
+        ("bfs", lambda g, t, *a: robot.bfs(g, *a)),
+        ("bfs_fast", lambda g, t, *a: robot.bfs_fast(t, *a)),
+        ("bitset", lambda g, t, *a: bfs_bitset(t, *a)),
+    ]
+
+    print(f"{'N':>5}" + "".join(f"  {name + ' (ms)':>14}" for name, _ in engines))
+    for size in args.sizes:
+        times = {name: [] for name, _ in engines}
+        for _ in range(args.instances):
+            _, _, grid, (D1, D2), (F1, F2), ori = benchmark.generate_instance(size, size, size, rng)
+            o = robot.ORI_STR_TO_ID[ori]
+            tables = robot.GridTables(grid)
+            lengths = set()
+            for name, run in engines:
+                t0 = time.perf_counter()
+                cmds = run(grid, tables, D1, D2, o, F1, F2)
+                times[name].append(time.perf_counter() - t0)
+                lengths.add(None if cmds is None else len(cmds))
+            assert len(lengths) == 1, f"longueurs différentes : {lengths}"
+        print(f"{size:5d}" + "".join(f"  {mean(times[name]) * 1000:14.3f}" for name, _ in engines))
+
+
+if __name__ == "__main__":
+    main()
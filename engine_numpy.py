@@ -0,0 +1,163 @@
+import time
+
+import numpy as np
+
+import robot
+
+
+def state_arrays(tables):
+    """
+    Table reach d'une GridTables (cf. GridTables._build_reach) sous forme de
+    tableau NumPy (4, M+1, N+1) : l'orientation est le premier axe, pour que
+    chaque plan d'orientation soit contigu en mémoire et que les décalages
+    travaillent sur des blocs contigus.
+    """
+    M, W = tables.M, tables.W
+    reach = np.frombuffer(tables.reach, dtype=np.uint8).reshape(M + 1, W, 4)
+    return np.ascontiguousarray(reach.transpose(2, 0, 1))
+
+
+def expand_layer(frontier, reach_ge):
+    """
+    Calcule d'un coup tous les états atteints en une commande depuis les
+    états de frontier (tableau booléen (4, h, w), orientation en premier) :
+      - G / D : permutation circulaire des plans d'orientation,
+      - a_n : décalage de n sommets dans la direction o, masqué par
+        reach_ge[n][o] (avance de n légale depuis l'état).
+    """
+    new = np.empty_like(frontier)
+    new[:3] = frontier[1:]          # G : (o+1) -> o
+    new[3] = frontier[0]
+    new[1:] |= frontier[:3]         # D : (o-1) -> o
+    new[0] |= frontier[3]
+
+    for n in (1, 2, 3):
+        src = frontier & reach_ge[n]
+        # nord : i -> i - n
+        new[0, :-n, :] |= src[0, n:, :]
+        # est : j -> j + n
+        new[1, :, n:] |= src[1, :, :-n]
+        # sud : i -> i + n
+        new[2, n:, :] |= src[2, :-n, :]
+        # ouest : j -> j - n
+        new[3, :, :-n] |= src[3, :, n:]
+    return new
+
+
+def bfs_layers(tables, start_i, start_j, start_o, goal_i, goal_j, stats=None):
+    """
+    BFS synchrone par couches, vectorisé avec NumPy : tous les états d'une
+    même distance sont développés ensemble par des décalages de tableaux
+    (voir expand_layer), au lieu d'être dépilés un par un.
+
+    visited est le tableau booléen des états atteints (indexé [o, i, j],
+    cf. state_arrays) et layer[o, i, j] l'indice de la couche où l'état a
+    été atteint (-1 sinon) ; le chemin est reconstruit à rebours en
+    cherchant à chaque fois un prédécesseur de la couche précédente.
+
+    Même signature et même résultat (séquence de longueur minimale, ou None)
+    que les moteurs de robot.ENGINES ; stats : cf. robot.record_layer_stats.
+    """
+    if not robot.endpoints_ok(tables, start_i, start_j, goal_i, goal_j):
+        return None
+
+    if stats is not None:
+        t0 = time.perf_counter()
+    reach = state_arrays(tables)
+    reach_ge = {n: reach >= n for n in (1, 2, 3)}
+    n_rows, n_cols = reach.shape[1:]
+
+    visited = np.zeros(reach.shape, dtype=bool)
+    layer = np.full(reach.shape, -1, dtype=np.int32)
+    visited[start_o, start_i, start_j] = True
+    layer[start_o, start_i, start_j] = 0
+
+    # La frontière est gardée dans sa boîte englobante (origine i0, j0) :
+    # une couche ne peut s'étendre que de 3 sommets au-delà, donc chaque
+    # développement ne travaille que sur cette fenêtre et non sur toute la
+    # grille.
+    frontier = np.zeros((4, 1, 1), dtype=bool)
+    frontier[start_o, 0, 0] = True
+    i0, j0 = start_i, start_j
+
+    depth = 0
+    expanded = 0
+    peak = 1
+    while True:
+        h, w = frontier.shape[1:]
+        gi, gj = goal_i - i0, goal_j - j0
+        if 0 <= gi < h and 0 <= gj < w and frontier[:, gi, gj].any():
+            break
+        if stats is not None:
+            size = int(frontier.sum())
+            expanded += size
+            peak = max(peak, size)
+
+        a0, a1 = max(i0 - 3, 0), min(i0 + h + 3, n_rows)
+        b0, b1 = max(j0 - 3, 0), min(j0 + w + 3, n_cols)
+        window = np.zeros((4, a1 - a0, b1 - b0), dtype=bool)
+        window[:, i0 - a0:i0 - a0 + h, j0 - b0:j0 - b0 + w] = frontier
+
+        new = expand_layer(window, {n: reach_ge[n][:, a0:a1, b0:b1] for n in (1, 2, 3)})
+        seen = visited[:, a0:a1, b0:b1]
+        new &= ~seen
+        if not new.any():
+            frontier = None
+            break
+        seen |= new
+        depth += 1
+        np.copyto(layer[:, a0:a1, b0:b1], depth, where=new)
+
+        rows = np.flatnonzero(new.any(axis=(0, 2)))
+        cols = np.flatnonzero(new.any(axis=(0, 1)))
+        frontier = new[:, rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+        i0, j0 = a0 + int(rows[0]), b0 + int(cols[0])
+
+    if stats is not None:
+        robot.record_layer_stats(stats, t0, expanded, peak, int(visited.sum()),
+                                 visited.nbytes + layer.nbytes)
+        t1 = time.perf_counter()
+    if frontier is None:
+        return None
+
+    goal_o = int(np.flatnonzero(frontier[:, goal_i - i0, goal_j - j0])[0])
+    commands = recover_path(layer, reach, goal_i, goal_j, goal_o)
+    if stats is not None:
+        stats.path_time = time.perf_counter() - t1
+    return commands
+
+
+def recover_path(layer, reach, i, j, o):
+    """
+    Remonte de l'état (i, j, o) jusqu'à l'état de couche 0 en choisissant à
+    chaque étape un prédécesseur de la couche précédente.
+    """
+    max_i, max_j = layer.shape[1] - 1, layer.shape[2] - 1
+    commands = []
+    d = int(layer[o, i, j])
+    while d > 0:
+        prev = d - 1
+        if layer[(o + 1) % 4, i, j] == prev:
+            commands.append("G")
+            o = (o + 1) % 4
+        elif layer[(o - 1) % 4, i, j] == prev:
+            commands.append("D")
+            o = (o - 1) % 4
+        else:
+            di, dj = robot.DIRS[o]
+            found = False
+            for n in (1, 2, 3):
+                pi = i - n * di
+                pj = j - n * dj
+                if not (0 <= pi <= max_i and 0 <= pj <= max_j):
+                    break
+                if layer[o, pi, pj] == prev and reach[o, pi, pj] >= n:
+                    commands.append(f"a{n}")
+                    i, j = pi, pj
+                    found = True
+                    break
+            if not found:
+                raise RuntimeError("aucun prédécesseur dans la couche précédente")
+        d = prev
+    commands.reverse()
+    return commands
@@ -0,0 +1,526 @@
+#!/usr/bin/env python3
+import argparse
+import heapq
+import random
+import time
+from array import array
+from statistics import mean
+
+import benchmark
+import robot
+
+# Distance « infinie » des tableaux d'entiers (bornes par bloc)
+INF = 1 << 30
+
+
+class HierarchicalPlanner:
+    """
+    Planification hiérarchique (à la HPA*) pour les très grandes grilles.
+
+    Les sommets sont découpés en blocs (clusters) de K x K sommets. Une
+    avance a_n dont le sommet d'arrivée est dans un autre bloc est une
+    traversée : son état de départ est une sortie du bloc, son état
+    d'arrivée une entrée du bloc voisin. Les traversées d'un bloc vers son
+    voisin, dans une direction, sont rangées par couloir (rangée pour est /
+    ouest, colonne pour nord / sud) ; des couloirs consécutifs forment une
+    ouverture. Comme dans HPA*, chaque ouverture n'est représentée que par
+    une traversée (couloir du milieu), ou deux pour une ouverture d'au
+    moins 6 couloirs (couloirs extrêmes).
+
+    À la construction, un BFS limité au bloc depuis chaque entrée gardée
+    donne ses distances aux sorties gardées du bloc : ce sont les arcs du
+    graphe abstrait (entrée -> entrée du bloc suivant, coût distance + 1),
+    calculés une fois pour toutes les requêtes. On calcule aussi, pour
+    chaque bloc, la plus petite distance interne de l'ensemble de ses
+    entrées d'une orientation à l'ensemble de ses sorties d'une autre
+    (bounds, toutes traversées comprises).
+
+    Une requête relie le départ et l'arrivée au graphe abstrait par un BFS
+    dans leur bloc, puis fait un A* sur ce graphe : les blocs du chemin
+    abstrait, et leurs voisins, forment le couloir où le chemin est
+    raffiné par un BFS (mode rapide, exact=False), borné par la longueur du
+    chemin abstrait (c'est celle d'un vrai chemin). Seuls ces blocs sont
+    parcourus ; le chemin est légal mais pas toujours minimal (cf.
+    measure_gap).
+
+    Mode exact : la longueur U du chemin rapide majore l'optimum. Un
+    Dijkstra sur les couples (bloc, orientation d'entrée), pondéré par
+    bounds, donne depuis le bloc d'arrivée un minorant de la distance
+    restante depuis tout état d'un bloc ; le BFS depuis le départ écarte
+    alors les états dont la distance plus ce minorant (ou robot.heuristic)
+    atteint U. Il ne parcourt que les blocs par lesquels un chemin plus
+    court reste possible ; s'il n'en trouve pas, le chemin rapide est
+    minimal. Sur grilles aléatoires, ce BFS coûte à peu près un
+    robot.bfs_fast : le gain des grandes grilles est celui du mode rapide.
+    """
+
+    def __init__(self, grid, K=16, tables=None, margin=1):
+        if K < 3:
+            raise ValueError("K doit valoir au moins 3 (une avance franchit au plus 3 sommets)")
+        self.tables = robot.GridTables(grid) if tables is None else tables
+        self.K = K
+        self.margin = margin
+        M, W = self.tables.M, self.tables.W
+        self.CW = (W + K - 1) // K       # nombre de blocs par rangée
+        self.n_clusters = ((M + K) // K) * self.CW
+        # Décalage d'indice de bloc d'une traversée d'orientation o (cf. robot.DIRS)
+        self.offset = (-self.CW, 1, self.CW, -1)
+        self.step4 = [4 * d for d in self.tables.step]
+
+        # Bloc de chaque sommet
+        self.cluster = array("i", [0]) * ((M + 1) * W)
+        for i in range(M + 1):
+            row = (i // K) * self.CW
+            for j in range(W):
+                self.cluster[i * W + j] = row + j // K
+
+        self.cross = {}         # sortie gardée -> (entrée, n)
+        self.exits = {}         # bloc -> sorties gardées
+        self.entries = {}       # bloc -> entrées gardées
+        self.links = {}         # entrée gardée -> [(entrée suivante, coût)]
+        # bounds[(c * 4 + o_in) * 4 + o_out] : plus petite distance dans le
+        # bloc c d'une entrée d'orientation o_in à une sortie d'orientation o_out
+        self.bounds = array("i", [INF]) * (self.n_clusters * 16)
+        self.exit_dirs = bytearray(self.n_clusters)     # bit o : sortie d'orientation o
+        self._seen = array("i", [0]) * len(self.tables.reach)     # cf. _block_search
+        self._stamp = 0
+        self._build()
+
+    def _find_crossings(self):
+        """
+        Toutes les traversées, sous la forme (sorties, entrées) :
+          sorties[(c, o)] : {couloir: [(n, sortie, entrée)]} pour le bloc c,
+          entrées[(c, o)] : ensemble des entrées d'orientation o du bloc c.
+        Une avance d'au plus 3 sommets ne quitte le bloc que depuis une
+        bande de 3 sommets le long du bord visé : on ne parcourt que ces
+        bandes, pas toute la grille.
+        """
+        t = self.tables
+        M, W, K = t.M, t.W, self.K
+        reach, cluster, step = t.reach, self.cluster, t.step
+        exits = {}
+        entries = {}
+        for o in range(4):
+            d = step[o]
+            for i in range(M + 1):
+                if o == 0 and i % K >= 3 or o == 2 and i % K < K - 3:
+                    continue
+                for j in range(W):
+                    if o == 1 and j % K < K - 3 or o == 3 and j % K >= 3:
+                        continue
+                    v = i * W + j
+                    s = v * 4 + o
+                    c = cluster[v]
+                    for n in range(1, reach[s] + 1):
+                        u = v + n * d
+                        if cluster[u] != c:
+                            e = u * 4 + o
+                            lane = i if o & 1 else j
+                            exits.setdefault((c, o), {}).setdefault(lane, []).append((n, s, e))
+                            entries.setdefault((cluster[u], o), set()).add(e)
+        return exits, entries
+
+    def _build(self):
+        exits, entries = self._find_crossings()
+        cluster = self.cluster
+
+        # Traversées gardées : par ouverture (couloirs consécutifs), celle
+        # du couloir du milieu, ou des deux extrêmes d'une ouverture longue ;
+        # dans un couloir, l'avance la plus courte
+        for (c, o), lanes in exits.items():
+            self.exit_dirs[c] |= 1 << o
+            keys = sorted(lanes)
+            runs = [[keys[0]]]
+            for lane in keys[1:]:
+                if lane == runs[-1][-1] + 1:
+                    runs[-1].append(lane)
+                else:
+                    runs.append([lane])
+            for run in runs:
+                for lane in [run[len(run) // 2]] if len(run) < 6 else [run[0], run[-1]]:
+                    n, x, e = min(lanes[lane])
+                    self.cross[x] = (e, n)
+                    self.exits.setdefault(c, []).append(x)
+                    self.entries.setdefault(cluster[e >> 2], []).append(e)
+
+        # Bornes internes : un BFS à sources multiples par (bloc, orientation d'entrée)
+        bounds = self.bounds
+        for (c, o_in), sources in entries.items():
+            block_exits = {o_out: [x for crossings in exits[c, o_out].values() for _, x, _ in crossings]
+                           for o_out in range(4) if (c, o_out) in exits}
+            dist = self._block_search(c, sources, [x for xs in block_exits.values() for x in xs])
+            for o_out, xs in block_exits.items():
+                bounds[(c * 4 + o_in) * 4 + o_out] = min((dist[x] for x in xs if x in dist),
+                                                         default=INF)
+
+        # Arcs du graphe abstrait : un BFS dans le bloc par entrée gardée,
+        # arrêté dès que les sorties gardées du bloc sont atteintes
+        for c, ents in self.entries.items():
+            xs = self.exits.get(c, ())
+            for e in ents:
+                dist = self._block_search(c, [e], xs)
+                self.links[e] = [(self.cross[x][0], dist[x] + 1) for x in xs if x in dist]
+
+    def _block_search(self, c, sources, targets, reverse=False):
+        """
+        BFS limité aux sommets du bloc c depuis les états sources (distance
+        0), mêmes commandes que robot.bfs ; en sens inverse (prédécesseurs,
+        cf. robot.DistanceField.to_goal) si reverse. S'arrête dès que tous
+        les états de targets sont atteints et retourne le dict
+        état cible -> distance des cibles atteintes.
+
+        Les états vus sont marqués dans un tableau plat commun à toutes les
+        recherches (seen[s] == numéro de la recherche), qui n'est donc
+        jamais remis à zéro.
+        """
+        reach, cluster, step4 = self.tables.reach, self.cluster, self.step4
+        left, right = (1, 3) if reverse else (3, 1)
+        self._stamp += 1
+        stamp, seen = self._stamp, self._seen
+        targets = set(targets)
+        found = {}
+        for s in sources:
+            seen[s] = stamp
+            if s in targets:
+                found[s] = 0
+        layer = list(sources)
+        d2 = 1
+        while layer and len(found) < len(targets):
+            nxt = []
+            push = nxt.append
+            for s in layer:
+                o = s & 3
+                base = s - o
+                for s2 in (base + ((o + left) & 3), base + ((o + right) & 3)):
+                    if seen[s2] != stamp:
+                        seen[s2] = stamp
+                        push(s2)
+                if reverse:
+                    m = reach[base + ((o + 2) & 3)]
+                    d4 = -step4[o]
+                else:
+                    m = reach[s]
+                    d4 = step4[o]
+                s2 = s
+                for _ in range(m):
+                    s2 += d4
+                    if cluster[s2 >> 2] != c:
+                        break       # les avances plus longues sortent aussi du bloc
+                    if seen[s2] != stamp:
+                        seen[s2] = stamp
+                        push(s2)
+            for s2 in targets.intersection(nxt):
+                found[s2] = d2
+            layer = nxt
+            d2 += 1
+        return found
+
+    # -- Requêtes ---------------------------------------------------------
+
+    def plan(self, start_i, start_j, start_o, goal_i, goal_j, exact=True):
+        """
+        Séquence de commandes du départ à l'arrivée, ou None (mêmes
+        conventions que robot.bfs). En mode exact la séquence est de
+        longueur minimale ; sinon c'est le meilleur chemin du couloir du
+        chemin abstrait (cf. la description de la classe).
+        """
+        t = self.tables
+        if not robot.endpoints_ok(t, start_i, start_j, goal_i, goal_j):
+            return None
+        if not t.may_connect(start_i, start_j, goal_i, goal_j):
+            return None
+        s0 = (start_i * t.W + start_j) * 4 + start_o
+        if start_i == goal_i and start_j == goal_j:
+            return []
+        fast = None
+        found = self.abstract_route(s0, goal_i, goal_j)
+        if found is not None:
+            length, route = found
+            allowed = bytearray(self.n_clusters)
+            for c in route:
+                allowed[c] = 1
+            for _ in range(self.margin):
+                for c in [c for c in range(self.n_clusters) if allowed[c]]:
+                    for o in range(4):
+                        if self.exit_dirs[c] >> o & 1:
+                            allowed[c + self.offset[o]] = 1
+            # Le chemin abstrait est un vrai chemin du couloir : sa
+            # longueur borne la recherche
+            fast = self.search(s0, goal_i, goal_j, length + 1, allowed)
+            if not exact:
+                return fast
+        shorter = self.search(s0, goal_i, goal_j, INF if fast is None else len(fast))
+        return fast if shorter is None else shorter
+
+    def abstract_route(self, s0, goal_i, goal_j):
+        """
+        A* (heuristique robot.heuristic) sur le graphe abstrait depuis
+        l'état s0, relié aux sorties gardées de son bloc, jusqu'au sommet
+        d'arrivée, relié aux entrées gardées du sien. Retourne la longueur du
+        chemin abstrait (celle d'un vrai chemin, donc un majorant de la
+        distance) et la liste des blocs traversés, ou None si le graphe
+        abstrait ne relie pas les deux sommets.
+        """
+        W = self.tables.W
+        cluster = self.cluster
+        goal_v = goal_i * W + goal_j
+        goal_states = [goal_v * 4 + o for o in range(4)]
+        c0, cg = cluster[s0 >> 2], cluster[goal_v]
+        heuristic = robot.heuristic
+        START, GOAL = -1, -2
+
+        xs = self.exits.get(c0, [])
+        dist0 = self._block_search(c0, [s0], xs + goal_states if c0 == cg else xs)
+        to_goal = self._block_search(cg, goal_states, self.entries.get(cg, ()), reverse=True)
+
+        g = {START: 0}
+        came = {START: None}
+        heap = [(0, 0, START)]
+        while heap:
+            _, gu, u = heapq.heappop(heap)
+            if u == GOAL:
+                break
+            if gu > g[u]:
+                continue
+            if u == START:
+                edges = [(self.cross[x][0], dist0[x] + 1) for x in xs if x in dist0]
+                if c0 == cg:
+                    edges += [(GOAL, dist0[s]) for s in goal_states if s in dist0]
+            else:
+                edges = self.links.get(u, [])
+                if u in to_goal:
+                    edges = edges + [(GOAL, to_goal[u])]
+            for w, cost in edges:
+                gw = gu + cost
+                if gw < g.get(w, INF):
+                    g[w] = gw
+                    came[w] = u
+                    if w == GOAL:
+                        f = gw
+                    else:
+                        v = w >> 2
+                        f = gw + heuristic(v // W, v % W, w & 3, goal_i, goal_j)
+                    heapq.heappush(heap, (f, gw, w))
+        if GOAL not in g:
+            return None
+
+        route = [cg, c0]
+        u = came[GOAL]
+        while u != START:
+            route.append(cluster[u >> 2])
+            u = came[u]
+        return g[GOAL], route
+
+    def block_lower_bounds(self, goal_c, limit=INF):
+        """
+        Dijkstra depuis le bloc d'arrivée sur les couples (bloc c,
+        orientation d'entrée o) : D[c * 4 + o] minore la distance à
+        l'arrivée de tout état entré dans c par une traversée d'orientation
+        o (0 dans le bloc d'arrivée ; INF au-delà de limit).
+        """
+        offset, bounds, exit_dirs = self.offset, self.bounds, self.exit_dirs
+        n_clusters = self.n_clusters
+        D = array("i", [INF]) * (n_clusters * 4)
+        heap = []
+        for o in range(4):
+            D[goal_c * 4 + o] = 0
+            heap.append((0, goal_c * 4 + o))
+        while heap:
+            d, node = heapq.heappop(heap)
+            if d >= limit:
+                break
+            if d > D[node]:
+                continue
+            o = node & 3
+            # Bloc quitté par la traversée d'orientation o qui mène dans ce bloc
+            c = (node >> 2) - offset[o]
+            if not (0 <= c < n_clusters and exit_dirs[c] >> o & 1):
+                continue
+            for o_in in range(4):
+                nd = d + 1 + bounds[(c * 4 + o_in) * 4 + o]
+                if nd < D[c * 4 + o_in] and nd < limit:
+                    D[c * 4 + o_in] = nd
+                    heapq.heappush(heap, (nd, c * 4 + o_in))
+        return D
+
+    def _heuristic_tables(self, goal_i, goal_j):
+        """
+        robot.heuristic vers (goal_i, goal_j) mise en tables, pour l'évaluer
+        sans appel de fonction :
+          h(i, j, o) = h_row[i] + h_col[j] + h_turns[k_row[i] + k_col[j] + o]
+        h_row / h_col comptent les avances selon chaque axe, k_row / k_col
+        codent le signe de di / dj, dont dépendent les rotations.
+        """
+        t = self.tables
+        h_row = [(abs(goal_i - i) + 2) // 3 for i in range(t.M + 1)]
+        k_row = [12 * ((goal_i > i) - (goal_i < i) + 1) for i in range(t.M + 1)]
+        h_col = [(abs(goal_j - j) + 2) // 3 for j in range(t.N + 1)]
+        k_col = [4 * ((goal_j > j) - (goal_j < j) + 1) for j in range(t.N + 1)]
+        # heuristic à une avance de l'arrivée sur chaque axe non nul, moins
+        # ces avances
+        h_turns = [robot.heuristic(0, 0, o, si, sj) - (si != 0) - (sj != 0)
+                   for si in (-1, 0, 1) for sj in (-1, 0, 1) for o in range(4)]
+        return h_row, k_row, h_col, k_col, h_turns
+
+    def search(self, s0, goal_i, goal_j, upper=INF, allowed=None):
+        """
+        BFS depuis l'état s0 jusqu'au sommet d'arrivée (flat buffers, cf.
+        robot.bfs_fast), limité :
+          - si allowed est donné, aux blocs c tels que allowed[c] ;
+          - si upper est fini, aux états s de distance d telle que
+            d + minorant(s) < upper, le minorant étant le plus grand de
+            robot.heuristic et de la borne du bloc de s (une traversée au
+            moins, puis block_lower_bounds).
+        Retourne un plus court chemin sous ces contraintes, ou None.
+        """
+        t = self.tables
+        W = t.W
+        reach, cluster, step4 = t.reach, self.cluster, self.step4
+        offset, exit_dirs = self.offset, self.exit_dirs
+        CMD_G, CMD_D = robot.CMD_G, robot.CMD_D
+        goal_v = goal_i * W + goal_j
+        goal_c = cluster[goal_v]
+        pruned = upper < INF
+
+        # Borne de chaque bloc : 0 / INF selon allowed, ou calculée au
+        # premier état rencontré dans le bloc (-1 : pas encore calculée)
+        if allowed is not None:
+            block_bound = array("i", [0 if a else INF for a in allowed])
+        elif pruned:
+            D = self.block_lower_bounds(goal_c, upper - 1)
+            block_bound = array("i", [-1]) * self.n_clusters
+            block_bound[goal_c] = 0
+        else:
+            block_bound = array("i", [0]) * self.n_clusters
+
+        def bound(c):
+            b = INF
+            for o in range(4):
+                if exit_dirs[c] >> o & 1:
+                    b = min(b, 1 + D[(c + offset[o]) * 4 + o])
+            block_bound[c] = b
+            return b
+
+        if pruned:
+            h_row, k_row, h_col, k_col, h_turns = self._heuristic_tables(goal_i, goal_j)
+
+        visited, parent, command = robot.new_state_buffers(t)
+        visited[s0] = 1
+        layer = [s0]
+        d2 = 1
+        while layer and d2 < upper:
+            nxt = []
+            push = nxt.append
+            for s in layer:
+                o = s & 3
+                base = s - o
+                v = s >> 2
+                # Rotations : même sommet, donc même bloc
+                if pruned:
+                    i, j = divmod(v, W)
+                    hm, hk = h_row[i] + h_col[j], k_row[i] + k_col[j]
+                for o2, code in (((o - 1) & 3, CMD_G), ((o + 1) & 3, CMD_D)):
+                    s2 = base + o2
+                    if visited[s2]:
+                        continue
+                    visited[s2] = 1
+                    if pruned and d2 + hm + h_turns[hk + o2] >= upper:
+                        continue
+                    parent[s2] = s
+                    command[s2] = code
+                    push(s2)
+                d4 = step4[o]
+                for n in range(1, reach[s] + 1):
+                    s2 = s + n * d4
+                    if visited[s2]:
+                        continue
+                    visited[s2] = 1
+                    v2 = s2 >> 2
+                    c2 = cluster[v2]
+                    b = block_bound[c2]
+                    if b < 0:
+                        b = bound(c2)
+                    if d2 + b >= upper:
+                        continue
+                    if pruned:
+                        i, j = divmod(v2, W)
+                        if d2 + h_row[i] + h_col[j] + h_turns[k_row[i] + k_col[j] + o] >= upper:
+                            continue
+                    parent[s2] = s
+                    command[s2] = CMD_G + 1 + n
+                    if v2 == goal_v:
+                        return robot.reconstruct(parent, command, s2)
+                    push(s2)
+            layer = nxt
+            d2 += 1
+        return None
+
+
+def measure_gap(planner, queries):
+    """
+    Compare le mode exact et le mode rapide sur des requêtes
+    (D1, D2, o, F1, F2). Retourne un dict : nombre de requêtes résolues,
+    nombre de réponses rapides optimales, écart relatif moyen et maximal
+    des longueurs, et temps totaux (s) des deux modes.
+    """
+    gaps = []
+    optimal = 0
+    t_exact = t_fast = 0.0
+    for D1, D2, o, F1, F2 in queries:
+        t0 = time.perf_counter()
+        ref = planner.plan(D1, D2, o, F1, F2)
+        t1 = time.perf_counter()
+        fast = planner.plan(D1, D2, o, F1, F2, exact=False)
+        t_fast += time.perf_counter() - t1
+        t_exact += t1 - t0
+        if ref is None:
+            continue
+        optimal += len(fast) == len(ref)
+        gaps.append((len(fast) - len(ref)) / max(len(ref), 1))
+    return {
+        "solved": len(gaps),
+        "optimal": optimal,
+        "mean_gap": mean(gaps) if gaps else 0.0,
+        "max_gap": max(gaps, default=0.0),
+        "time_exact": t_exact,
+        "time_fast": t_fast,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mesure le planificateur hiérarchique.")
+    parser.add_argument("--size", type=int, default=200, help="taille N de la grille N x N")
+    parser.add_argument("--density", type=float, default=0.1, help="proportion d'obstacles")
+    parser.add_argument("--cluster", type=int, default=16, help="taille K des blocs")
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    size = args.size
+    grid = benchmark.generate_instance(size, size, int(size * size * args.density), rng)[2]
+
+    t0 = time.perf_counter()
+    planner = HierarchicalPlanner(grid, K=args.cluster)
+    t_build = time.perf_counter() - t0
+
+    queries = [(rng.randrange(1, size - 1), rng.randrange(1, size - 1), rng.randrange(4),
+                rng.randrange(1, size - 1), rng.randrange(1, size - 1))
+               for _ in range(args.queries)]
+
+    t0 = time.perf_counter()
+    for D1, D2, o, F1, F2 in queries:
+        robot.bfs_fast(planner.tables, D1, D2, o, F1, F2)
+    t_flat = time.perf_counter() - t0
+
+    r = measure_gap(planner, queries)
+    print(f"construction : {t_build:.3f} s")
+    print(f"bfs_fast     : {t_flat:.3f} s")
+    print(f"exact        : {r['time_exact']:.3f} s")
+    print(f"rapide       : {r['time_fast']:.3f} s")
+    print(f"optimales    : {r['optimal']} / {r['solved']}")
+    print(f"écart moyen  : {r['mean_gap'] * 100:.2f} %  (max {r['max_gap'] * 100:.2f} %)")
+
+
+if __name__ == "__main__":
+    main()
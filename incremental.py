@@ -0,0 +1,192 @@
+import heapq
+
+import robot
+
+INF = float("inf")
+
+
+class IncrementalPlanner:
+    """
+    Replanification incrémentale (LPA*, Lifelong Planning A*) sur le graphe
+    des états (i, j, o) de robot.bfs, pour un départ et une arrivée fixés
+    pendant que des cases changent (obstacle posé ou retiré).
+
+    Après chaque modification, seules les tables autour de la case sont
+    recalculées (GridTables.update_cell), et seuls les états dont une
+    transition entrante a changé sont remis en cause ; les valeurs g des
+    autres états, calculées lors des recherches précédentes, sont
+    réutilisées.
+
+    Les 4 orientations du sommet d'arrivée sont reliées à un état virtuel
+    (indice GOAL) par des arcs de coût 1 (un coût nul donnerait à GOAL la
+    même clé qu'un état d'arrivée encore en file, et LPA* pourrait s'arrêter
+    trop tôt), donc g(GOAL) = T + 1. L'heuristique est robot.heuristic,
+    cohérente : LPA* retourne le même nombre de commandes T qu'un BFS
+    complet sur la grille courante.
+    """
+
+    def __init__(self, grid, start_i, start_j, start_o, goal_i, goal_j):
+        self.grid = [list(row) for row in grid]
+        self.tables = robot.GridTables(self.grid)
+        self.start = (start_i, start_j, start_o)
+        self.goal = (goal_i, goal_j)
+
+        W = self.tables.W
+        self.s0 = (start_i * W + start_j) * 4 + start_o
+        self.goal_v = goal_i * W + goal_j
+        self.GOAL = (self.tables.M + 1) * W * 4   # état virtuel d'arrivée
+
+        self.g = {}
+        self.rhs = {self.s0: 0}
+        self.heap = []
+        self.keys = {}       # clé courante des états présents dans la file
+        self.expanded = 0    # états développés depuis la création
+        self._push(self.s0)
+
+    # -- Graphe des états -------------------------------------------------
+
+    def _h(self, s):
+        if s == self.GOAL:
+            return 0
+        W = self.tables.W
+        v = s >> 2
+        return robot.heuristic(v // W, v % W, s & 3, *self.goal)
+
+    def _succ(self, s):
+        """Successeurs (état, coût) de s : rotations, avances, état virtuel."""
+        if s == self.GOAL:
+            return []
+        o = s & 3
+        base = s - o
+        out = [(base + ((o - 1) & 3), 1), (base + ((o + 1) & 3), 1)]
+        d4 = 4 * self.tables.step[o]
+        for n in range(1, self.tables.reach[s] + 1):
+            out.append((s + n * d4, 1))
+        if s >> 2 == self.goal_v:
+            out.append((self.GOAL, 1))
+        return out
+
+    def _pred(self, s):
+        """Prédécesseurs (état, coût, commande) de s (cf. robot.bfs_bidir)."""
+        if s == self.GOAL:
+            base = self.goal_v * 4
+            return [(base + o, 1, None) for o in range(4)]
+        o = s & 3
+        base = s - o
+        out = [(base + ((o + 1) & 3), 1, "G"), (base + ((o - 1) & 3), 1, "D")]
+        if not self.tables.vertex[s >> 2]:
+            # On n'arrive jamais par une avance sur un sommet non valide
+            return out
+        d4 = 4 * self.tables.step[o]
+        for n in range(1, self.tables.reach[base + ((o + 2) & 3)] + 1):
+            out.append((s - n * d4, 1, f"a{n}"))
+        return out
+
+    # -- LPA* ---------------------------------------------------------------
+
+    def _key(self, s):
+        m = min(self.g.get(s, INF), self.rhs.get(s, INF))
+        return (m + self._h(s), m)
+
+    def _push(self, s):
+        k = self._key(s)
+        self.keys[s] = k
+        heapq.heappush(self.heap, (k, s))
+
+    def _update(self, s):
+        if s != self.s0:
+            best = INF
+            g = self.g
+            for p, cost, _ in self._pred(s):
+                gp = g.get(p, INF) + cost
+                if gp < best:
+                    best = gp
+            self.rhs[s] = best
+        if self.g.get(s, INF) != self.rhs.get(s, INF):
+            self._push(s)
+        else:
+            self.keys.pop(s, None)
+
+    def _top_key(self):
+        heap = self.heap
+        while heap:
+            k, s = heap[0]
+            if self.keys.get(s) == k:
+                return k
+            heapq.heappop(heap)     # entrée périmée
+        return (INF, INF)
+
+    def _compute(self):
+        GOAL = self.GOAL
+        while (self._top_key() < self._key(GOAL) or
+               self.rhs.get(GOAL, INF) != self.g.get(GOAL, INF)):
+            if not self.heap:
+                break
+            k, u = heapq.heappop(self.heap)
+            del self.keys[u]
+            self.expanded += 1
+            g_u = self.g.get(u, INF)
+            rhs_u = self.rhs.get(u, INF)
+            if g_u > rhs_u:
+                self.g[u] = rhs_u
+                for s, _ in self._succ(u):
+                    self._update(s)
+            else:
+                self.g[u] = INF
+                self._update(u)
+                for s, _ in self._succ(u):
+                    self._update(s)
+
+    # -- API ---------------------------------------------------------------
+
+    def plan(self):
+        """
+        Séquence minimale de commandes sur la grille courante, ou None
+        (mêmes conventions que robot.bfs).
+        """
+        si, sj, _ = self.start
+        if not robot.endpoints_ok(self.tables, si, sj, *self.goal):
+            return None
+        self._compute()
+        if self.g.get(self.GOAL, INF) == INF:
+            return None
+
+        # Remontée depuis l'état virtuel : à chaque pas, le prédécesseur p
+        # qui minimise g(p) + coût
+        g = self.g
+        commands = []
+        s = self.GOAL
+        while s != self.s0:
+            p, cost, cmd = min(self._pred(s), key=lambda e: g.get(e[0], INF) + e[1])
+            if g.get(p, INF) == INF:
+                raise RuntimeError("aucun prédécesseur atteint")
+            if cmd is not None:
+                commands.append(cmd)
+            s = p
+        commands.reverse()
+        return commands
+
+    def set_cell(self, r, c, value):
+        """
+        Pose (value = 1) ou retire (value = 0) un obstacle sur la case (r, c)
+        puis répare la solution. Retourne la nouvelle séquence (cf. plan).
+        """
+        if self.grid[r][c] == value:
+            return self.plan()
+        self.grid[r][c] = value
+        changed = self.tables.update_cell(self.grid, r, c)
+
+        # Une avance a_n depuis s n'existe que si n <= reach[s] : les états
+        # atteints par une avance apparue ou disparue doivent être revus
+        d4 = [4 * d for d in self.tables.step]
+        reach = self.tables.reach
+        for s, old in changed:
+            new = reach[s]
+            o = s & 3
+            for n in range(min(old, new) + 1, max(old, new) + 1):
+                self._update(s + n * d4[o])
+        return self.plan()
+
+    def toggle(self, r, c):
+        """Inverse la case (r, c) (obstacle <-> libre), cf. set_cell."""
+        return self.set_cell(r, c, 1 - self.grid[r][c])
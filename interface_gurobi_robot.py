@@ -1,25 +1,125 @@
+import argparse
 import random
-import sys
+import time
 
+# gurobipy est optionnel : sans licence ou sans le module, le backend
+# heuristique (build_obstacle_grid_heuristic) reste disponible
 try:
     import gurobipy as gp
     from gurobipy import GRB
 except ImportError:
-    print("Erreur : le module gurobipy n'est pas disponible.")
-    sys.exit(1)
+    gp = GRB = None
 
 import robot  
 
 
-def build_obstacle_grid_with_gurobi(M, N, P):
+def random_weights(M, N, rng=random):
+    """Poids aléatoires w_ij dans [0, 1000] des cases de la grille MxN."""
+    return [[rng.randint(0, 1000) for _ in range(N)] for _ in range(M)]
+
+
+def build_obstacle_grid_with_gurobi(M, N, P, weights=None, matrix=True, timings=None):
     """
     Construit et résout le PL de placement des P obstacles sur une grille de cases MxN
     (indices de cases 0..M-1, 0..N-1), en minimisant la somme des poids w_ij, sous
     les contraintes énoncées dans le sujet.
+
+    weights : poids w_ij (tirés par random_weights si None).
+    matrix : construit le modèle avec l'API matricielle (addMVar,
+             addMConstr) : chaque famille de contraintes est une matrice
+             creuse posée en un seul appel, au lieu d'une boucle Python de
+             quicksum par contrainte (matrix=False, construction d'origine,
+             sans numpy ni scipy).
+    timings : si c'est un dict, il reçoit "build" et "solve" (secondes).
+    """
+    if gp is None:
+        raise RuntimeError("le module gurobipy n'est pas disponible")
+    if weights is None:
+        weights = random_weights(M, N)
+
+    t0 = time.perf_counter()
+    if matrix:
+        model, x = _build_model_matrix(M, N, P, weights)
+    else:
+        model, x = _build_model_loops(M, N, P, weights)
+    t1 = time.perf_counter()
+
+    #Résolution
+    model.setParam("OutputFlag", 0)  
+    model.optimize()
+    t2 = time.perf_counter()
+    if timings is not None:
+        timings["build"] = t1 - t0
+        timings["solve"] = t2 - t1
+
+    if model.status != GRB.OPTIMAL:
+        print("Pas de solution optimale trouvée (status Gurobi =", model.status, ")")
+        return None, None
+
+    # Construction de la grille de cases obstacle (M x N)
+    if matrix:
+        values = x.X.reshape(M, N)
+        grid = [[1 if values[i, j] > 0.5 else 0 for j in range(N)] for i in range(M)]
+    else:
+        grid = [[0 for _ in range(N)] for _ in range(M)]
+        for i in range(M):
+            for j in range(N):
+                val = x[i, j].X
+                grid[i][j] = 1 if val > 0.5 else 0
+
+    return grid, weights
+
+
+def _build_model_matrix(M, N, P, weights):
+    """
+    Même modèle que _build_model_loops, avec l'API matricielle : les
+    variables forment un vecteur x (case (i, j) -> indice i * N + j) et
+    chaque famille de contraintes est une matrice creuse scipy.sparse
+    construite par numpy, ajoutée en un seul appel à addMConstr
+    (nécessite numpy et scipy).
     """
-    # Génération des poids aléatoires w_ij
-    weights = [[random.randint(0, 1000) for _ in range(N)] for _ in range(M)]
+    import numpy as np
+    import scipy.sparse as sp
 
+    n = M * N
+    idx = np.arange(n).reshape(M, N)
+    model = gp.Model("obstacle_placement")
+    x = model.addMVar(n, vtype=GRB.BINARY, name="x")
+    model.setMObjective(None, np.asarray(weights, dtype=float).ravel(), 0.0,
+                        sense=GRB.MINIMIZE)
+
+    # Total (ligne 0), puis une ligne de matrice par ligne et par colonne de la grille
+    cells = idx.ravel()
+    rows = np.concatenate([np.zeros(n, dtype=np.int64),
+                           1 + np.repeat(np.arange(M), N),
+                           1 + M + np.repeat(np.arange(N), M)])
+    cols = np.concatenate([cells, cells, idx.T.ravel()])
+    A = sp.csr_matrix((np.ones(3 * n), (rows, cols)), shape=(1 + M + N, n))
+    sense = np.array([GRB.EQUAL] + [GRB.LESS_EQUAL] * (M + N))
+    rhs = np.concatenate([[P], np.full(M, 2 * P / M), np.full(N, 2 * P / N)])
+    model.addMConstr(A, x, sense, rhs, name="capacite")
+
+    # Motif 101 interdit : x[a] + x[c] - x[b] <= 1 pour chaque triplet
+    # (a, b, c) de cases consécutives d'une ligne ou d'une colonne
+    triples = []
+    if N > 2:
+        triples.append((idx[:, :-2].ravel(), idx[:, 1:-1].ravel(), idx[:, 2:].ravel()))
+    if M > 2:
+        triples.append((idx[:-2, :].ravel(), idx[1:-1, :].ravel(), idx[2:, :].ravel()))
+    if triples:
+        first, middle, last = (np.concatenate(t) for t in zip(*triples))
+        k = len(first)
+        r = np.arange(k)
+        B = sp.csr_matrix(
+            (np.concatenate([np.ones(k), -np.ones(k), np.ones(k)]),
+             (np.concatenate([r, r, r]), np.concatenate([first, middle, last]))),
+            shape=(k, n))
+        model.addMConstr(B, x, GRB.LESS_EQUAL, np.ones(k), name="no_101")
+    return model, x
+
+
+def _build_model_loops(M, N, P, weights):
+    """Construction d'origine du modèle, contrainte par contrainte."""
     # Création du modèle Gurobi
     model = gp.Model("obstacle_placement")
 
@@ -75,22 +175,105 @@ def build_obstacle_grid_with_gurobi(M, N, P):
                 name=f"no_101_col_{i}_{j}"
             )
 
-    #Résolution
-    model.setParam("OutputFlag", 0)  
-    model.optimize()
+    return model, x
 
-    if model.status != GRB.OPTIMAL:
-        print("Pas de solution optimale trouvée (status Gurobi =", model.status, ")")
+
+def build_obstacle_grid_heuristic(M, N, P, weights=None, timings=None):
+    """
+    Placement des P obstacles sans Gurobi, par une heuristique gloutonne de
+    coût minimal respectant les mêmes contraintes que le PL :
+      - les cases sont parcourues par poids croissant ; une case est prise
+        si sa ligne et sa colonne sont sous leur plafond (2P/M, 2P/N) et si
+        elle ne crée pas de motif 101 (case à distance 2 occupée alors que
+        la case entre les deux est libre) ;
+      - une case refusée à cause d'un motif 101 peut devenir acceptable
+        quand la case du milieu est prise : les cases refusées sont
+        reparcourues (toujours par poids croissant) tant que l'on progresse.
+    La solution n'est pas forcément optimale (son coût majore celui du PL).
+
+    Mêmes paramètres et même retour que build_obstacle_grid_with_gurobi
+    (timings : "build" = tri des cases, "solve" = placement) ; retourne
+    (None, None) si l'heuristique ne parvient pas à placer P obstacles.
+    """
+    if weights is None:
+        weights = random_weights(M, N)
+
+    t0 = time.perf_counter()
+    cells = sorted((weights[i][j], i, j) for i in range(M) for j in range(N))
+    t1 = time.perf_counter()
+
+    max_per_row = 2 * P // M
+    max_per_col = 2 * P // N
+    grid = [[0] * N for _ in range(M)]
+    row_count = [0] * M
+    col_count = [0] * N
+
+    def makes_101(i, j):
+        for di, dj in robot.DIRS:
+            i2, j2 = i + 2 * di, j + 2 * dj
+            if (0 <= i2 < M and 0 <= j2 < N and grid[i2][j2]
+                    and not grid[i + di][j + dj]):
+                return True
+        return False
+
+    placed = 0
+    todo = cells
+    while placed < P:
+        rejected = []
+        for w, i, j in todo:
+            if placed == P:
+                break
+            if row_count[i] >= max_per_row or col_count[j] >= max_per_col:
+                continue    # plafond atteint : définitif
+            if makes_101(i, j):
+                rejected.append((w, i, j))
+                continue
+            grid[i][j] = 1
+            row_count[i] += 1
+            col_count[j] += 1
+            placed += 1
+        if len(rejected) == len(todo):
+            break       # aucun progrès possible
+        todo = rejected
+    t2 = time.perf_counter()
+    if timings is not None:
+        timings["build"] = t1 - t0
+        timings["solve"] = t2 - t1
+
+    if placed < P:
+        print(f"Heuristique : seulement {placed} obstacles placés sur {P}.")
         return None, None
+    return grid, weights
 
-    # Construction de la grille de cases obstacle (M x N)
-    grid = [[0 for _ in range(N)] for _ in range(M)]
-    for i in range(M):
-        for j in range(N):
-            val = x[i, j].X
-            grid[i][j] = 1 if val > 0.5 else 0
 
-    return grid, weights
+def grid_cost(grid, weights):
+    """Somme des poids des cases occupées."""
+    return sum(w for row, wrow in zip(grid, weights) for x, w in zip(row, wrow) if x)
+
+
+# Backends de placement : nom -> fonction (M, N, P, weights, timings)
+BACKENDS = {
+    "gurobi": lambda M, N, P, weights, timings: build_obstacle_grid_with_gurobi(
+        M, N, P, weights, matrix=True, timings=timings),
+    "gurobi-boucles": lambda M, N, P, weights, timings: build_obstacle_grid_with_gurobi(
+        M, N, P, weights, matrix=False, timings=timings),
+    "heuristique": build_obstacle_grid_heuristic,
+}
+
+
+def compare_backends(M, N, P, seed=0):
+    """
+    Lance chaque backend disponible sur les mêmes poids et affiche les
+    temps de construction / résolution et le coût obtenu.
+    """
+    weights = random_weights(M, N, random.Random(seed))
+    names = [name for name in BACKENDS if gp is not None or not name.startswith("gurobi")]
+    print(f"{'backend':>15}  {'construction (s)':>16}  {'résolution (s)':>14}  {'coût':>10}")
+    for name in names:
+        timings = {}
+        grid, _ = BACKENDS[name](M, N, P, weights, timings)
+        cost = "-" if grid is None else grid_cost(grid, weights)
+        print(f"{name:>15}  {timings.get('build', 0):16.3f}  {timings.get('solve', 0):14.3f}  {cost:>10}")
 
 
 def print_grid(grid):
@@ -102,7 +285,28 @@ def print_grid(grid):
         print(" ".join(str(grid[i][j]) for j in range(N)))
 
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Placement d'obstacles (PL ou heuristique) puis BFS.")
+    parser.add_argument("--backend", choices=sorted(BACKENDS),
+                        help="méthode de placement (défaut : gurobi si disponible, "
+                             "sinon heuristique)")
+    parser.add_argument("--compare", type=int, nargs=3, metavar=("M", "N", "P"),
+                        help="compare les temps et coûts des backends, sans interaction")
+    parser.add_argument("--seed", type=int, default=0, help="graine des poids pour --compare")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.compare:
+        compare_backends(*args.compare, seed=args.seed)
+        return
+
+    backend = args.backend or ("gurobi" if gp is not None else "heuristique")
+    if backend.startswith("gurobi") and gp is None:
+        print("Erreur : le module gurobipy n'est pas disponible (utiliser --backend heuristique).")
+        return
+
     print("Interface Gurobi + BFS")
 
     # Choix de M, N, P
@@ -122,11 +326,14 @@ def main():
         print("La grille doit être au moins 3x3 pour que les sommets intérieurs existent.")
         return
 
-    #Génération des obstacles par PL + Gurobi
-    grid, weights = build_obstacle_grid_with_gurobi(M, N, P)
+    #Génération des obstacles (PL + Gurobi, ou heuristique)
+    timings = {}
+    grid, weights = BACKENDS[backend](M, N, P, random_weights(M, N), timings)
     if grid is None:
         print("Impossible de générer la grille d'obstacles.")
         return
+    print(f"Placement ({backend}) : construction {timings['build']:.3f} s, "
+          f"résolution {timings['solve']:.3f} s, coût {grid_cost(grid, weights)}")
 
     print_grid(grid)
 
@@ -1,5 +1,16 @@
+import argparse
+import contextlib
+import hashlib
+import io
+import itertools
+import json
+import mmap
+import os
 import sys
-from collections import deque
+import time
+from array import array
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
 
 # Mapping orientations <-> indices
 ORI_STR_TO_ID = {
@@ -74,7 +85,63 @@ def edge_ok(i, j, di, dj, grid):
     return True
 
 
-def bfs(grid, start_i, start_j, start_o, goal_i, goal_j):
+class SearchStats:
+    """
+    Instrumentation d'une recherche, remplie par un moteur quand on lui
+    passe stats=SearchStats() ; avec stats=None (défaut) aucun comptage
+    n'est fait dans les boucles.
+      expanded     : états développés
+      enqueued     : états mis en file (état initial compris ; pour astar,
+                     états distincts atteints)
+      peak_queue   : longueur maximale de la file, ou de la frontière pour
+                     les moteurs par couches (0 si non mesurée : astar)
+      vertex_calls : appels à vertex_ok (bfs de référence seulement)
+      edge_calls   : appels à edge_ok (bfs de référence seulement)
+      search_time  : secondes passées dans la boucle de recherche
+                     (génération des mouvements)
+      path_time    : secondes passées à reconstruire le chemin
+      memory       : octets occupés par les tampons de la recherche
+                     (visited / parent / command ou équivalents)
+    Les champs sont aussi accessibles comme ceux d'un dict (st["expanded"]).
+    """
+
+    __slots__ = ("expanded", "enqueued", "peak_queue", "vertex_calls", "edge_calls",
+                 "search_time", "path_time", "memory")
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, 0)
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+    def __setitem__(self, name, value):
+        setattr(self, name, value)
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        fields = ", ".join(f"{k}={v!r}" for k, v in self.as_dict().items())
+        return f"SearchStats({fields})"
+
+
+class _CountingQueue(deque):
+    """File FIFO qui compte les ajouts et la longueur maximale atteinte."""
+
+    def __init__(self):
+        super().__init__()
+        self.enqueued = 0
+        self.peak = 0
+
+    def append(self, x):
+        deque.append(self, x)
+        self.enqueued += 1
+        if len(self) > self.peak:
+            self.peak = len(self)
+
+
+def bfs(grid, start_i, start_j, start_o, goal_i, goal_j, stats=None):
     """
     BFS sur l'espace des états (i, j, o) où (i, j) est un sommet de la grille de rails :
       i ∈ [0..M], j ∈ [0..N]
@@ -88,7 +155,24 @@ def bfs(grid, start_i, start_j, start_o, goal_i, goal_j):
 
     Retourne la séquence minimale de commandes sous forme de liste de chaînes
     ['D', 'a1', 'a3', ...] ou None s'il n'y a pas de chemin.
+
+    Si stats est un SearchStats, il reçoit les compteurs de la recherche,
+    dont le nombre d'appels à vertex_ok / edge_ok.
     """
+    # Sans statistiques, v_ok / e_ok sont directement vertex_ok / edge_ok ;
+    # sinon des versions qui comptent leurs appels
+    v_ok, e_ok = vertex_ok, edge_ok
+    if stats is not None:
+        calls = [0, 0]
+
+        def v_ok(i, j, grid):
+            calls[0] += 1
+            return vertex_ok(i, j, grid)
+
+        def e_ok(i, j, di, dj, grid):
+            calls[1] += 1
+            return edge_ok(i, j, di, dj, grid)
+
     M = len(grid) # nombre de lignes de cases
     N = len(grid[0]) # nombre de colonnes de cases
     max_i = M          # sommets en i: 0..M
@@ -102,9 +186,9 @@ def bfs(grid, start_i, start_j, start_o, goal_i, goal_j):
     
 
     # On vérifie que les sommets de départ et d'arrivée sont "ok"
-    if not vertex_ok(start_i, start_j, grid):
+    if not v_ok(start_i, start_j, grid):
         return None
-    if not vertex_ok(goal_i, goal_j, grid):
+    if not v_ok(goal_i, goal_j, grid):
         return None
 
 
@@ -113,7 +197,9 @@ def bfs(grid, start_i, start_j, start_o, goal_i, goal_j):
     # parent[i][j][o] = (pi, pj, po, cmd) ou None si pas de parent (Mémorise l’état précédent dans le BFS et la commande utilisée afin de pouvoir reconstruire le chemin de et la séquence de commandes après avoir trouvé la solution)
     parent = [[[None] * 4 for _ in range(max_j + 1)] for _ in range(max_i + 1)]
 
-    q = deque() #créé une file (pour utiliser FIFO), sert a explorer les etats par couches , d’abord la distance 0, puis distance 1, puis distance 2, etc.
+    if stats is not None:
+        t0 = time.perf_counter()
+    q = deque() if stats is None else _CountingQueue() #créé une file (pour utiliser FIFO), sert a explorer les etats par couches , d’abord la distance 0, puis distance 1, puis distance 2, etc.
     q.append((start_i, start_j, start_o)) #ajoute l'état initial à la file
     visited[start_i][start_j][start_o] = True #marque l'état initial comme visité
 
@@ -151,12 +237,12 @@ def bfs(grid, start_i, start_j, start_o, goal_i, goal_j):
                     break
 
                 # Le rail entre (ii, jj) et (ni, nj) doit être libre
-                if not edge_ok(ii, jj, di, dj, grid):
+                if not e_ok(ii, jj, di, dj, grid):
                     ok = False
                     break
 
                 # Le sommet d'arrivée doit être dégagé
-                if not vertex_ok(ni, nj, grid):
+                if not v_ok(ni, nj, grid):
                     ok = False
                     break
 
@@ -172,6 +258,16 @@ def bfs(grid, start_i, start_j, start_o, goal_i, goal_j):
                 parent[ii][jj][o] = (i, j, o, f"a{n}")
                 q.append((ii, jj, o)) #état atteint après avoir avancé de n cases
 
+    if stats is not None:
+        t1 = time.perf_counter()
+        stats.expanded = q.enqueued - len(q) - (found_state is not None)
+        stats.enqueued = q.enqueued
+        stats.peak_queue = q.peak
+        stats.vertex_calls, stats.edge_calls = calls
+        stats.search_time = t1 - t0
+        stats.memory = _nested_size(visited) + _nested_size(parent)
+        t1 = time.perf_counter()
+
     #si aucun état final n'a été trouvé, on retourne None
     if found_state is None:
         return None
@@ -189,68 +285,1706 @@ def bfs(grid, start_i, start_j, start_o, goal_i, goal_j):
         ci, cj, co = pi, pj, po
 
     commands.reverse() #on fait ici un revers de la liste des commandes car on les a collectées en partant de l'état final vers l'état initial
+    if stats is not None:
+        stats.path_time = time.perf_counter() - t1
+    return commands
+
+
+def _nested_size(obj):
+    """Taille mémoire (octets) de listes imbriquées et des tuples qu'elles contiennent."""
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(_nested_size(x) for x in obj)
+    return 0
+
+
+def buffers_size(*buffers):
+    """Taille mémoire (octets) du contenu de tampons plats (bytearray, array)."""
+    return sum(len(b) * getattr(b, "itemsize", 1) for b in buffers)
+
+
+def _finish_stats(stats, t0, found, reconstruct_path):
+    """
+    Complète stats après la boucle d'un moteur (search_time depuis t0),
+    puis mesure la reconstruction du chemin : retourne reconstruct_path()
+    si found, None sinon.
+    """
+    t1 = time.perf_counter()
+    stats.search_time = t1 - t0
+    if not found:
+        return None
+    commands = reconstruct_path()
+    stats.path_time = time.perf_counter() - t1
     return commands
 
 
-def solve(instances):
+def record_layer_stats(stats, t0, expanded, peak, enqueued, memory):
     """
-    instances : liste de tuples (M, N, grid, D1, D2, F1, F2, ori_str)
-    Retourne les lignes de sortie sous forme de liste de chaînes.
+    Remplit stats à la fin de la boucle d'un moteur par couches
+    (engine_numpy, engine_bitset), où la file est la couche courante :
+    peak_queue est la plus grande couche.
+    """
+    stats.search_time = time.perf_counter() - t0
+    stats.expanded = expanded
+    stats.enqueued = enqueued
+    stats.peak_queue = peak
+    stats.memory = memory
+
+
+# Codes des commandes stockés dans les tampons plats (command[s] = code)
+COMMANDS = ["G", "D", "a1", "a2", "a3"]
+CMD_G = 0
+CMD_D = 1
+
+
+def new_state_buffers(tables):
+    """
+    Alloue les tampons plats d'une recherche sur la grille de tables :
+      - visited : bytearray, visited[s] = 1 si l'état s a été atteint,
+      - parent  : array('i'), indice de l'état précédent (-1 si aucun),
+      - command : bytearray, code (indice dans COMMANDS) de la commande
+                  ayant mené à s.
+    Un état (i, j, o) a pour indice s = (i * W + j) * 4 + o.
+    """
+    n_states = (tables.M + 1) * tables.W * 4
+    visited = bytearray(n_states)
+    parent = array("i", [-1]) * n_states
+    command = bytearray(n_states)
+    return visited, parent, command
+
+
+def decode_state(tables, s):
+    """Retourne le triplet (i, j, o) codé par l'indice d'état s."""
+    v = s >> 2
+    return v // tables.W, v % tables.W, s & 3
+
+
+def reconstruct(parent, command, s):
+    """
+    Remonte les tampons parent / command depuis l'état s jusqu'à l'état
+    initial (parent = -1) et retourne la liste des commandes dans l'ordre.
+    """
+    commands = []
+    p = parent[s]
+    while p >= 0:
+        commands.append(COMMANDS[command[s]])
+        s = p
+        p = parent[s]
+    commands.reverse()
+    return commands
+
+
+class GridTables:
+    """
+    Tables de passage pré-calculées UNE fois par grille, pour que la recherche
+    n'ait plus qu'à faire des lectures d'octets au lieu d'appeler vertex_ok /
+    edge_ok à chaque pas.
+
+    Les sommets (i, j), i ∈ [0..M], j ∈ [0..N], sont numérotés v = i * W + j
+    avec W = N + 1. Chaque table est un bytearray de taille (M+1) * W :
+      - vertex[v] = 1 si vertex_ok(i, j, grid),
+      - hrail[v]  = 1 si le rail horizontal (i, j) - (i, j+1) est libre,
+      - vrail[v]  = 1 si le rail vertical   (i, j) - (i+1, j) est libre.
+
+    S'y ajoute la table reach (voir _build_reach) qui donne directement les
+    avances a1/a2/a3 légales depuis chaque état. Une même GridTables sert
+    à toutes les requêtes posées sur la même grille.
+    """
+
+    def __init__(self, grid):
+        M = len(grid)
+        N = len(grid[0])
+        W = N + 1
+        self.M = M
+        self.N = N
+        self.W = W
+
+        size = (M + 1) * W
+        vertex = bytearray(size)
+        hrail = bytearray(size)
+        vrail = bytearray(size)
+
+        for i in range(M + 1):
+            up = grid[i - 1] if i > 0 else None   # ligne de cases au-dessus des sommets i
+            down = grid[i] if i < M else None     # ligne de cases en dessous des sommets i
+            base = i * W
+            for j in range(N + 1):
+                # Rail horizontal : cases (i-1, j) et (i, j)
+                if j < N:
+                    if (up is None or up[j] != 1) and (down is None or down[j] != 1):
+                        hrail[base + j] = 1
+
+                # Rail vertical : cases (i, j-1) et (i, j)
+                if down is not None:
+                    if (j == 0 or down[j - 1] != 1) and (j == N or down[j] != 1):
+                        vrail[base + j] = 1
+
+                # Sommet intérieur entouré de 4 cases libres
+                if 0 < i < M and 0 < j < N:
+                    if (up[j - 1] != 1 and up[j] != 1 and
+                            down[j - 1] != 1 and down[j] != 1):
+                        vertex[base + j] = 1
+
+        self.vertex = vertex
+        self.hrail = hrail
+        self.vrail = vrail
+
+        # Pour l'orientation o : décalage d'indice d'un pas, table de rails
+        # concernée et décalage vers l'indice du rail emprunté
+        self.step = (-W, 1, W, -1)
+        self.rails = (vrail, hrail, vrail, hrail)
+        self.rail_off = (-W, 0, 0, -1)
+
+        self.reach = self._build_reach()
+        self._labels = None
+        # Requêtes filtrées par may_connect (les composantes ne sont
+        # étiquetées qu'à partir de la deuxième)
+        self._queries = 0
+
+    def _build_reach(self):
+        """
+        reach[s], pour l'état s = v * 4 + o : nombre de pas consécutifs légaux
+        (rail libre puis sommet valide), plafonné à 3, depuis le sommet v dans
+        la direction o. Donc a1/a2/a3 est possible depuis s ssi n <= reach[s].
+        """
+        self.reach = bytearray((self.M + 1) * self.W * 4)
+        self._sweep_reach(0, self.M, 0, self.N)
+        return self.reach
+
+    def _sweep_reach(self, i_lo, i_hi, j_lo, j_hi):
+        """
+        (Re)calcule reach pour les sommets de la fenêtre [i_lo..i_hi] x
+        [j_lo..j_hi], en temps linéaire en balayant chaque ligne / colonne à
+        rebours de la direction : reach(v) = 1 + reach(v + pas) si le pas est
+        légal, 0 sinon. Les valeurs hors de la fenêtre sont supposées à jour.
+        """
+        M, N, W = self.M, self.N, self.W
+        vertex = self.vertex
+        reach = self.reach
+
+        # (orientation, lignes parcourues, colonnes parcourues) : on part du
+        # côté vers lequel on avance ; sur le bord de la grille, reach vaut 0
+        for i in range(i_lo, i_hi + 1):
+            for j in (0, N):
+                if j_lo <= j <= j_hi:
+                    reach[(i * W + j) * 4 + (1 if j == N else 3)] = 0
+        for i in (0, M):
+            if i_lo <= i <= i_hi:
+                for j in range(j_lo, j_hi + 1):
+                    reach[(i * W + j) * 4 + (2 if i == M else 0)] = 0
+
+        sweeps = (
+            (0, range(max(i_lo, 1), i_hi + 1), range(j_lo, j_hi + 1)),                # nord
+            (1, range(i_lo, i_hi + 1), range(min(j_hi, N - 1), j_lo - 1, -1)),        # est
+            (2, range(min(i_hi, M - 1), i_lo - 1, -1), range(j_lo, j_hi + 1)),        # sud
+            (3, range(i_lo, i_hi + 1), range(max(j_lo, 1), j_hi + 1)),                # ouest
+        )
+        for o, rows, cols in sweeps:
+            d = self.step[o]
+            r = self.rails[o]
+            ro = self.rail_off[o]
+            for i in rows:
+                base = i * W
+                for j in cols:
+                    v = base + j
+                    if r[v + ro] and vertex[v + d]:
+                        n = reach[(v + d) * 4 + o] + 1
+                        reach[v * 4 + o] = n if n < 3 else 3
+                    else:
+                        reach[v * 4 + o] = 0
+
+    def update_cell(self, grid, r, c):
+        """
+        Met à jour les tables après la modification de la case grid[r][c]
+        (obstacle posé ou retiré), sans tout recalculer : seuls les 4
+        sommets et 4 rails qui bordent la case changent, et reach ne dépend
+        que des 3 pas suivants, donc d'une fenêtre de quelques sommets.
+        Retourne la liste des (s, ancien reach) des états dont reach a
+        changé ; les composantes sont invalidées.
+        """
+        M, N, W = self.M, self.N, self.W
+        for i in (r, r + 1):
+            for j in (c, c + 1):
+                self.vertex[i * W + j] = 1 if vertex_ok(i, j, grid) else 0
+        for i in (r, r + 1):
+            self.hrail[i * W + c] = 1 if edge_ok(i, c, 0, 1, grid) else 0
+        for j in (c, c + 1):
+            self.vrail[r * W + j] = 1 if edge_ok(r, j, 1, 0, grid) else 0
+
+        i_lo, i_hi = max(r - 3, 0), min(r + 4, M)
+        j_lo, j_hi = max(c - 3, 0), min(c + 4, N)
+        old = {}
+        for i in range(i_lo, i_hi + 1):
+            for j in range(j_lo, j_hi + 1):
+                base = (i * W + j) * 4
+                for s in range(base, base + 4):
+                    old[s] = self.reach[s]
+        self._sweep_reach(i_lo, i_hi, j_lo, j_hi)
+        self._labels = None
+        return [(s, n) for s, n in old.items() if self.reach[s] != n]
+
+    def components(self):
+        """
+        Étiquettes des composantes connexes du graphe des sommets valides
+        (deux sommets sont voisins si un pas a1 légal les relie) : labels[v]
+        vaut le numéro de composante du sommet v, -1 s'il n'est pas valide.
+        Les rotations se faisant sur place, l'orientation ne change rien à
+        l'accessibilité : deux sommets de composantes différentes ne sont
+        reliés par aucune séquence de commandes.
+        Calculées au premier appel puis conservées avec la grille.
+        """
+        if self._labels is not None:
+            return self._labels
+
+        vertex = self.vertex
+        reach = self.reach
+        step = self.step
+        labels = array("i", [-1]) * len(vertex)
+        label = 0
+        for v0 in range(len(vertex)):
+            if not vertex[v0] or labels[v0] >= 0:
+                continue
+            labels[v0] = label
+            stack = [v0]
+            while stack:
+                v = stack.pop()
+                base = v * 4
+                for o in range(4):
+                    if reach[base + o]:
+                        v2 = v + step[o]
+                        if labels[v2] < 0:
+                            labels[v2] = label
+                            stack.append(v2)
+            label += 1
+
+        self._labels = labels
+        return labels
+
+    def connected(self, start_i, start_j, goal_i, goal_j):
+        """
+        True si départ et arrivée sont des sommets valides de la même
+        composante (test en O(1) une fois les composantes calculées) : sinon
+        aucun moteur ne peut trouver de chemin.
+        """
+        if not endpoints_ok(self, start_i, start_j, goal_i, goal_j):
+            return False
+        labels = self.components()
+        W = self.W
+        return labels[start_i * W + start_j] == labels[goal_i * W + goal_j]
+
+    def may_connect(self, start_i, start_j, goal_i, goal_j):
+        """
+        Filtre paresseux avant une recherche : False seulement si aucun
+        chemin n'est possible. L'étiquetage des composantes coûte autant
+        qu'un parcours de toute la grille ; il n'est fait qu'à partir de la
+        deuxième requête posée sur ces tables (ou s'il existe déjà), une
+        grille qui ne sert qu'une fois se contentant de la recherche.
+        """
+        if not endpoints_ok(self, start_i, start_j, goal_i, goal_j):
+            return False
+        self._queries += 1
+        if self._labels is None and self._queries < 2:
+            return True
+        return self.connected(start_i, start_j, goal_i, goal_j)
+
+
+def endpoints_ok(tables, start_i, start_j, goal_i, goal_j):
+    """
+    Vérifie, comme le début de bfs, que départ et arrivée sont des sommets
+    de [0..M] x [0..N] et qu'ils sont valides pour le robot.
+    """
+    if not (0 <= start_i <= tables.M and 0 <= start_j <= tables.N):
+        return False
+    if not (0 <= goal_i <= tables.M and 0 <= goal_j <= tables.N):
+        return False
+    W = tables.W
+    return bool(tables.vertex[start_i * W + start_j] and
+                tables.vertex[goal_i * W + goal_j])
+
+
+def bfs_fast(tables, start_i, start_j, start_o, goal_i, goal_j, stats=None):
+    """
+    Même BFS que bfs (mêmes états, même ordre d'exploration, donc même
+    séquence de commandes), mais les tests géométriques sont de simples
+    lectures dans les tables d'une GridTables.
+
+    Comme seuls des sommets valides (donc intérieurs) sont atteints, un pas
+    depuis l'un d'eux reste toujours dans [0..M] x [0..N] : aucun test de
+    bornes n'est nécessaire dans la boucle.
+
+    visited / parent / command sont des tampons plats indexés par l'entier
+    d'état (voir new_state_buffers) plutôt que des listes imbriquées de
+    tuples, ce qui divise l'empreinte mémoire et le temps d'allocation.
+
+    Si stats est un SearchStats, il reçoit les compteurs de la recherche ;
+    la file est alors une _CountingQueue (pas de coût sans stats).
+    """
+    if not endpoints_ok(tables, start_i, start_j, goal_i, goal_j):
+        return None
+
+    W = tables.W
+    reach = tables.reach
+    step4 = [4 * d for d in tables.step]
+
+    # État (i, j, o) codé par l'entier s = (i * W + j) * 4 + o
+    visited, parent, command = new_state_buffers(tables)
+
+    s0 = (start_i * W + start_j) * 4 + start_o
+    goal_v = goal_i * W + goal_j
+
+    if stats is not None:
+        t0 = time.perf_counter()
+    q = deque() if stats is None else _CountingQueue()
+    q.append(s0)
+    visited[s0] = 1
+
+    found_state = -1
+
+    while q:
+        s = q.popleft()
+        v = s >> 2
+        o = s & 3
+
+        if v == goal_v:
+            found_state = s
+            break
+
+        # Rotations : G (code 0) puis D (code 1)
+        base = s - o
+        for code, o2 in ((CMD_G, (o - 1) & 3), (CMD_D, (o + 1) & 3)):
+            s2 = base + o2
+            if not visited[s2]:
+                visited[s2] = 1
+                parent[s2] = s
+                command[s2] = code
+                q.append(s2)
+
+        # Avances de 1, 2, 3 cases : O(1) grâce à la table reach
+        m = reach[s]
+        if not m:
+            continue
+        d4 = step4[o]
+        for n in (3, 2, 1):
+            if n > m:
+                continue
+            s2 = s + n * d4
+            if not visited[s2]:
+                visited[s2] = 1
+                parent[s2] = s
+                command[s2] = CMD_G + 1 + n
+                q.append(s2)
+
+    if stats is not None:
+        # états atteints - états encore en file - état d'arrivée (dépilé, non développé)
+        stats.expanded = q.enqueued - len(q) - (found_state >= 0)
+        stats.enqueued = q.enqueued
+        stats.peak_queue = q.peak
+        stats.memory = buffers_size(visited, parent, command)
+        return _finish_stats(stats, t0, found_state >= 0,
+                             lambda: reconstruct(parent, command, found_state))
+
+    if found_state < 0:
+        return None
+
+    return reconstruct(parent, command, found_state)
+
+
+def bfs_bidir(tables, start_i, start_j, start_o, goal_i, goal_j, stats=None):
+    """
+    BFS bidirectionnel : une recherche avant depuis (start_i, start_j, start_o)
+    et une recherche arrière depuis les 4 orientations du sommet d'arrivée,
+    développées couche par couche (toujours la plus petite frontière).
+
+    Mouvements inverses de l'état (v, o) :
+      - G depuis (v, o+1), D depuis (v, o-1),
+      - a_n depuis (v - n pas, o) si n <= reach de (v, o opposée) : le
+        segment est le même dans les deux sens, et ses deux extrémités sont
+        des sommets valides.
+
+    Si les profondeurs complètement découvertes sont a (avant) et b (arrière),
+    tout chemin de longueur <= a + b a un état connu des deux côtés ; dès que
+    la meilleure rencontre vaut au plus a + b + 1, elle est donc optimale.
+
+    Retourne une séquence minimale de commandes (même longueur que bfs, pas
+    forcément la même séquence) ou None. stats : comme pour bfs_fast
+    (peak_queue est la plus grande frontière développée).
+    """
+    if not endpoints_ok(tables, start_i, start_j, goal_i, goal_j):
+        return None
+
+    W = tables.W
+    reach = tables.reach
+    step4 = [4 * d for d in tables.step]
+    n_states = (tables.M + 1) * W * 4
+
+    s0 = (start_i * W + start_j) * 4 + start_o
+    goal_v = goal_i * W + goal_j
+    if s0 >> 2 == goal_v:
+        return []
+
+    # Côté avant : dist_f + parent / command ; côté arrière : dist_b + état
+    # suivant vers l'arrivée (nxt) et commande avant menant à cet état suivant
+    dist_f = array("i", [-1]) * n_states
+    dist_b = array("i", [-1]) * n_states
+    _, parent, command = new_state_buffers(tables)
+    _, nxt, command_b = new_state_buffers(tables)
+
+    dist_f[s0] = 0
+    frontier_f = [s0]
+    frontier_b = []
+    for o in range(4):
+        sg = goal_v * 4 + o
+        dist_b[sg] = 0
+        frontier_b.append(sg)
+
+    if stats is not None:
+        t0 = time.perf_counter()
+    depth_f = 0
+    depth_b = 0
+    best_len = -1
+    best_state = -1
+    expanded = 0
+    peak = 0
+
+    while frontier_f and frontier_b:
+        forward = len(frontier_f) <= len(frontier_b)
+        new_frontier = []
+        n_frontier = len(frontier_f) if forward else len(frontier_b)
+        expanded += n_frontier
+        if n_frontier > peak:
+            peak = n_frontier
+
+        if forward:
+            depth = depth_f + 1
+            for s in frontier_f:
+                o = s & 3
+                base = s - o
+                succ = [(base + ((o - 1) & 3), CMD_G), (base + ((o + 1) & 3), CMD_D)]
+                m = reach[s]
+                for n in (3, 2, 1):
+                    if n <= m:
+                        succ.append((s + n * step4[o], CMD_G + 1 + n))
+                for s2, code in succ:
+                    if dist_f[s2] >= 0:
+                        continue
+                    dist_f[s2] = depth
+                    parent[s2] = s
+                    command[s2] = code
+                    new_frontier.append(s2)
+                    db = dist_b[s2]
+                    if db >= 0 and (best_len < 0 or depth + db < best_len):
+                        best_len = depth + db
+                        best_state = s2
+            frontier_f = new_frontier
+            depth_f = depth
+        else:
+            depth = depth_b + 1
+            for s in frontier_b:
+                o = s & 3
+                base = s - o
+                pred = [(base + ((o + 1) & 3), CMD_G), (base + ((o - 1) & 3), CMD_D)]
+                m = reach[base + ((o + 2) & 3)]
+                for n in (3, 2, 1):
+                    if n <= m:
+                        pred.append((s - n * step4[o], CMD_G + 1 + n))
+                for s2, code in pred:
+                    if dist_b[s2] >= 0:
+                        continue
+                    dist_b[s2] = depth
+                    nxt[s2] = s
+                    command_b[s2] = code
+                    new_frontier.append(s2)
+                    df = dist_f[s2]
+                    if df >= 0 and (best_len < 0 or depth + df < best_len):
+                        best_len = depth + df
+                        best_state = s2
+            frontier_b = new_frontier
+            depth_b = depth
+
+        if best_len >= 0 and best_len <= depth_f + depth_b + 1:
+            break
+
+    def join_paths():
+        commands = reconstruct(parent, command, best_state)
+        s = best_state
+        while nxt[s] >= 0:
+            commands.append(COMMANDS[command_b[s]])
+            s = nxt[s]
+        return commands
+
+    if stats is not None:
+        stats.expanded = expanded
+        stats.enqueued = (len(dist_f) - dist_f.count(-1)) + (len(dist_b) - dist_b.count(-1))
+        stats.peak_queue = peak
+        stats.memory = buffers_size(dist_f, dist_b, parent, command, nxt, command_b)
+        return _finish_stats(stats, t0, best_state >= 0, join_paths)
+
+    if best_state < 0:
+        return None
+    return join_paths()
+
+
+def heuristic(i, j, o, goal_i, goal_j):
+    """
+    Minorant du nombre de commandes pour aller de (i, j, o) au sommet
+    (goal_i, goal_j), quels que soient les obstacles :
+      - au moins ceil(|di| / 3) + ceil(|dj| / 3) avances (3 rails au plus
+        par commande),
+      - plus le nombre minimal de rotations pour faire face aux directions
+        à emprunter : 0, 1 ou 2 s'il n'y a qu'un axe à parcourir, 1 ou 2 s'il
+        y en a deux (selon que l'on fait déjà face à l'une d'elles).
+    Chaque commande fait baisser cette valeur d'au plus 1 : l'heuristique
+    est admissible et cohérente.
+    """
+    di = goal_i - i
+    dj = goal_j - j
+    moves = (abs(di) + 2) // 3 + (abs(dj) + 2) // 3
+
+    # Orientations à emprunter (cf. DIRS) : nord / sud, puis est / ouest
+    o_i = 0 if di < 0 else 2
+    o_j = 1 if dj > 0 else 3
+    if di and dj:
+        turns = 1 if o in (o_i, o_j) else 2
+    elif di:
+        turns = 0 if o == o_i else (2 if o == (o_i + 2) % 4 else 1)
+    elif dj:
+        turns = 0 if o == o_j else (2 if o == (o_j + 2) % 4 else 1)
+    else:
+        turns = 0
+    return moves + turns
+
+
+def astar(tables, start_i, start_j, start_o, goal_i, goal_j, stats=None):
+    """
+    A* sur les états (i, j, o) avec l'heuristique ci-dessus. Toutes les
+    commandes coûtant 1, les priorités f = g + h sont de petits entiers :
+    on utilise une file à seaux (buckets[f]) plutôt qu'un tas, et dans un
+    seau on dépile le dernier état inséré (le plus profond d'abord).
+
+    Retourne une séquence de commandes de même longueur que bfs (optimale),
+    ou None. stats : comme pour bfs_fast (sans peak_queue).
+    """
+    if not endpoints_ok(tables, start_i, start_j, goal_i, goal_j):
+        return None
+
+    W = tables.W
+    reach = tables.reach
+    step4 = [4 * d for d in tables.step]
+    n_states = (tables.M + 1) * W * 4
+
+    g = array("i", [-1]) * n_states
+    closed, parent, command = new_state_buffers(tables)
+
+    s0 = (start_i * W + start_j) * 4 + start_o
+    goal_v = goal_i * W + goal_j
+    g[s0] = 0
+
+    if stats is not None:
+        t0 = time.perf_counter()
+    buckets = [[] for _ in range(heuristic(start_i, start_j, start_o, goal_i, goal_j) + 1)]
+    buckets[-1].append(s0)
+    f = len(buckets) - 1
+    expanded = 0
+    found_state = -1
+
+    while f < len(buckets):
+        bucket = buckets[f]
+        if not bucket:
+            f += 1
+            continue
+        s = bucket.pop()
+        if closed[s]:
+            continue
+        closed[s] = 1
+
+        v = s >> 2
+        if v == goal_v:
+            found_state = s
+            break
+        expanded += 1
+
+        o = s & 3
+        base = s - o
+        g2 = g[s] + 1
+        succ = [(base + ((o - 1) & 3), CMD_G), (base + ((o + 1) & 3), CMD_D)]
+        m = reach[s]
+        for n in (3, 2, 1):
+            if n <= m:
+                succ.append((s + n * step4[o], CMD_G + 1 + n))
+
+        for s2, code in succ:
+            if closed[s2] or (0 <= g[s2] <= g2):
+                continue
+            g[s2] = g2
+            parent[s2] = s
+            command[s2] = code
+            v2 = s2 >> 2
+            f2 = g2 + heuristic(v2 // W, v2 % W, s2 & 3, goal_i, goal_j)
+            while len(buckets) <= f2:
+                buckets.append([])
+            buckets[f2].append(s2)
+
+    if stats is not None:
+        stats.expanded = expanded
+        stats.enqueued = len(g) - g.count(-1)
+        stats.memory = buffers_size(g, closed, parent, command)
+        return _finish_stats(stats, t0, found_state >= 0,
+                             lambda: reconstruct(parent, command, found_state))
+
+    if found_state < 0:
+        return None
+
+    return reconstruct(parent, command, found_state)
+
+
+def _layer_distances(tables, sources, targets, reverse=False, first=False, stats=None):
+    """
+    BFS par couches qui ne calcule que des distances : on ne garde que
+    visited (un octet par état) et la couche courante, sans parent ni
+    commande. sources : états de départ (distance 0) ; targets : états dont
+    on veut la distance. En sens inverse (reverse), on suit les mouvements
+    inverses (cf. bfs_bidir) : la distance obtenue est celle de la cible
+    vers les sources.
+
+    Retourne {cible: distance} pour les cibles atteintes ; la recherche
+    s'arrête dès que toutes les cibles sont atteintes (ou la première,
+    avec first).
+    """
+    if stats is not None:
+        t0 = time.perf_counter()
+    reach = tables.reach
+    step4 = [4 * d for d in tables.step]
+    visited = bytearray((tables.M + 1) * tables.W * 4)
+    for s in sources:
+        visited[s] = 1
+    frontier = list(dict.fromkeys(sources))
+    remaining = [t for t in dict.fromkeys(targets) if not visited[t]]
+    found = {t: 0 for t in dict.fromkeys(targets) if visited[t]}
+    depth = 0
+    expanded = peak = 0
+    enqueued = len(frontier)
+
+    while frontier and remaining and not (first and found):
+        depth += 1
+        expanded += len(frontier)
+        if len(frontier) > peak:
+            peak = len(frontier)
+        new = []
+        for s in frontier:
+            o = s & 3
+            base = s - o
+            if reverse:
+                for s2 in (base + ((o + 1) & 3), base + ((o - 1) & 3)):
+                    if not visited[s2]:
+                        visited[s2] = 1
+                        new.append(s2)
+                m = reach[base + ((o + 2) & 3)]
+                d4 = -step4[o]
+            else:
+                for s2 in (base + ((o - 1) & 3), base + ((o + 1) & 3)):
+                    if not visited[s2]:
+                        visited[s2] = 1
+                        new.append(s2)
+                m = reach[s]
+                d4 = step4[o]
+            for n in range(1, m + 1):
+                s2 = s + n * d4
+                if not visited[s2]:
+                    visited[s2] = 1
+                    new.append(s2)
+        enqueued += len(new)
+        frontier = new
+        still = []
+        for t in remaining:
+            if visited[t]:
+                found[t] = depth
+            else:
+                still.append(t)
+        remaining = still
+
+    if stats is not None:
+        stats.expanded = expanded
+        stats.enqueued = enqueued
+        stats.peak_queue = peak
+        stats.memory = len(visited)
+        stats.search_time = time.perf_counter() - t0
+    return found
+
+
+def bfs_distance(tables, start_i, start_j, start_o, goal_i, goal_j, stats=None):
+    """
+    Mode « distance seule » : nombre minimal de commandes T du départ au
+    sommet d'arrivée, ou -1 s'il n'y a pas de chemin (même T que bfs).
+    Aucun parent n'est mémorisé et aucun chemin n'est reconstruit : la
+    mémoire se limite à un octet par état (contre six pour bfs_fast).
+    stats : comme pour bfs_fast.
+    """
+    if not endpoints_ok(tables, start_i, start_j, goal_i, goal_j):
+        return -1
+    W = tables.W
+    s0 = (start_i * W + start_j) * 4 + start_o
+    base = (goal_i * W + goal_j) * 4
+    found = _layer_distances(tables, [s0], range(base, base + 4), first=True, stats=stats)
+    return min(found.values()) if found else -1
+
+
+def cost_matrix(tables, vertices, orientation=None):
+    """
+    Matrice des coûts (nombre minimal de commandes) entre des sommets :
+      vertices    : liste de sommets (i, j)
+      orientation : orientation de départ (0..3) en chaque sommet, ou None
+                    pour la meilleure des 4
+    cost[a][b] est le coût de vertices[a] vers vertices[b] (-1 si
+    impossible, 0 sur la diagonale pour un sommet valide).
+
+    Chaque colonne b est obtenue par une seule recherche inverse en
+    distance seule depuis les 4 états de vertices[b], qui donne d'un coup
+    la distance de tous les états de départ ; les couples de composantes
+    différentes (GridTables.connected) ne sont pas cherchés.
+    """
+    W = tables.W
+    n = len(vertices)
+    orients = range(4) if orientation is None else (orientation,)
+    valid = [endpoints_ok(tables, i, j, i, j) for i, j in vertices]
+    cost = [[-1] * n for _ in range(n)]
+
+    for b, (gi, gj) in enumerate(vertices):
+        if not valid[b]:
+            continue
+        sources = [(gi * W + gj) * 4 + o for o in range(4)]
+        starts = {}
+        for a, (i, j) in enumerate(vertices):
+            if valid[a] and tables.connected(i, j, gi, gj):
+                starts[a] = [(i * W + j) * 4 + o for o in orients]
+        targets = [s for ss in starts.values() for s in ss]
+        found = _layer_distances(tables, sources, targets, reverse=True)
+        for a, ss in starts.items():
+            ds = [found[s] for s in ss if s in found]
+            if ds:
+                cost[a][b] = min(ds)
+    return cost
+
+
+class DistanceField:
+    """
+    Résultat d'un BFS conservé pour répondre à plusieurs requêtes sur la
+    même grille par simple reconstruction :
+      - DistanceField.from_start(tables, i, j, o) : BFS avant depuis un état
+        de départ, puis path_to(goal_i, goal_j) pour chaque arrivée ;
+      - DistanceField.to_goal(tables, i, j) : BFS arrière depuis les 4
+        orientations d'un sommet d'arrivée, puis path_from(i, j, o) pour
+        chaque départ.
+
+    Sans targets, le BFS couvre toute la composante du point de départ.
+    Avec targets (sommets (i, j) ou états (i, j, o) d'arrivée pour
+    from_start, états de départ (i, j, o) pour to_goal), il s'arrête dès
+    que toutes les cibles sont atteintes : il ne coûte alors pas plus que bfs_fast vers la cible la
+    plus lointaine, et seules ces cibles peuvent être interrogées
+    (ValueError pour une autre requête sans réponse).
+
+    dist[s] vaut la distance (en commandes) de l'état s au départ (ou à
+    l'arrivée), -1 s'il n'est pas atteignable (ou pas encore atteint).
+    """
+
+    def __init__(self, tables, reverse):
+        self.tables = tables
+        self.reverse = reverse
+        n_states = (tables.M + 1) * tables.W * 4
+        self.dist = array("i", [-1]) * n_states
+        # link[s] : parent (BFS avant) ou état suivant vers l'arrivée (BFS arrière)
+        _, self.link, self.command = new_state_buffers(tables)
+        # rank[s] : ordre de découverte (BFS avant seulement, rempli par
+        # from_start), pour choisir la même orientation d'arrivée que bfs_fast
+        self.rank = None
+        self.expanded = 0       # états développés (cf. SearchStats)
+        self.enqueued = 0       # états mis en file, ceux de départ compris
+        # False si le BFS s'est arrêté sur ses cibles avant d'épuiser la composante
+        self.complete = True
+
+    @classmethod
+    def from_start(cls, tables, start_i, start_j, start_o, targets=None):
+        field = cls(tables, reverse=False)
+        field.rank = rank = array("i", [-1]) * len(field.dist)
+        W = tables.W
+        if not (0 <= start_i <= tables.M and 0 <= start_j <= tables.N):
+            return field
+        if not tables.vertex[start_i * W + start_j]:
+            return field
+
+        reach = tables.reach
+        step4 = [4 * d for d in tables.step]
+        dist = field.dist
+        parent = field.link
+        command = field.command
+
+        s0 = (start_i * W + start_j) * 4 + start_o
+        dist[s0] = 0
+        rank[s0] = 0
+        # Sommets cibles pas encore atteints : le premier état atteint d'un
+        # sommet est celui que choisit bfs_fast, on peut s'arrêter ensuite.
+        # Une cible (i, j, o) est un état, à atteindre lui-même
+        pending = 0
+        if targets is not None:
+            is_target = bytearray(len(tables.vertex))
+            is_target_state = bytearray(len(dist))
+            for target in targets:
+                i, j = target[0], target[1]
+                if 0 <= i <= tables.M and 0 <= j <= tables.N and tables.vertex[i * W + j]:
+                    marks, k = ((is_target, i * W + j) if len(target) == 2
+                                else (is_target_state, (i * W + j) * 4 + target[2]))
+                    if not marks[k]:
+                        marks[k] = 1
+                        pending += 1
+            if is_target[s0 >> 2]:
+                is_target[s0 >> 2] = 0
+                pending -= 1
+            if is_target_state[s0]:
+                is_target_state[s0] = 0
+                pending -= 1
+        # La file est une liste parcourue par un indice : sa position dans
+        # la liste donne l'ordre de découverte de chaque état
+        q = [s0]
+        head = 0
+        while head < len(q) and (targets is None or pending):
+            s = q[head]
+            head += 1
+            o = s & 3
+            base = s - o
+            d2 = dist[s] + 1
+            succ = [(base + ((o - 1) & 3), CMD_G), (base + ((o + 1) & 3), CMD_D)]
+            m = reach[s]
+            for n in (3, 2, 1):
+                if n <= m:
+                    succ.append((s + n * step4[o], CMD_G + 1 + n))
+            for s2, code in succ:
+                if dist[s2] < 0:
+                    dist[s2] = d2
+                    rank[s2] = len(q)
+                    parent[s2] = s
+                    command[s2] = code
+                    q.append(s2)
+                    if pending:
+                        if is_target[s2 >> 2]:
+                            is_target[s2 >> 2] = 0
+                            pending -= 1
+                        if is_target_state[s2]:
+                            pending -= 1
+
+        field.expanded = head
+        field.enqueued = len(q)
+        field.complete = head >= len(q)
+        return field
+
+    @classmethod
+    def to_goal(cls, tables, goal_i, goal_j, targets=None):
+        field = cls(tables, reverse=True)
+        W = tables.W
+        if not (0 <= goal_i <= tables.M and 0 <= goal_j <= tables.N):
+            return field
+        goal_v = goal_i * W + goal_j
+        if not tables.vertex[goal_v]:
+            return field
+
+        reach = tables.reach
+        step4 = [4 * d for d in tables.step]
+        dist = field.dist
+        nxt = field.link
+        command = field.command
+
+        q = []
+        for o in range(4):
+            dist[goal_v * 4 + o] = 0
+            q.append(goal_v * 4 + o)
+        # États de départ cibles pas encore atteints
+        pending = 0
+        if targets is not None:
+            is_target = bytearray(len(dist))
+            for i, j, o in targets:
+                if 0 <= i <= tables.M and 0 <= j <= tables.N and tables.vertex[i * W + j]:
+                    s = (i * W + j) * 4 + o
+                    if dist[s] < 0 and not is_target[s]:
+                        is_target[s] = 1
+                        pending += 1
+        head = 0
+        while head < len(q) and (targets is None or pending):
+            s = q[head]
+            head += 1
+            o = s & 3
+            base = s - o
+            d2 = dist[s] + 1
+            # Mouvements inverses (cf. bfs_bidir)
+            pred = [(base + ((o + 1) & 3), CMD_G), (base + ((o - 1) & 3), CMD_D)]
+            m = reach[base + ((o + 2) & 3)]
+            for n in (3, 2, 1):
+                if n <= m:
+                    pred.append((s - n * step4[o], CMD_G + 1 + n))
+            for s2, code in pred:
+                if dist[s2] < 0:
+                    dist[s2] = d2
+                    nxt[s2] = s
+                    command[s2] = code
+                    q.append(s2)
+                    if pending and is_target[s2]:
+                        pending -= 1
+
+        field.expanded = head
+        field.enqueued = len(q)
+        field.complete = head >= len(q)
+        return field
+
+    def path_to(self, goal_i, goal_j, goal_o=None):
+        """
+        (Champ avant) Séquence de commandes du départ jusqu'au sommet
+        (goal_i, goal_j), identique à celle de bfs_fast, ou None. Avec
+        goal_o : séquence minimale jusqu'à l'état (goal_i, goal_j, goal_o).
+        """
+        tables = self.tables
+        if not endpoints_ok(tables, goal_i, goal_j, goal_i, goal_j):
+            return None
+        base = (goal_i * tables.W + goal_j) * 4
+        rank = self.rank
+        best = -1
+        for s in (range(base, base + 4) if goal_o is None else (base + goal_o,)):
+            if rank[s] >= 0 and (best < 0 or rank[s] < rank[best]):
+                best = s
+        if best < 0:
+            self._check_complete()
+            return None
+        return reconstruct(self.link, self.command, best)
+
+    def _check_complete(self):
+        """Une requête sans réponse n'est sûre que si le BFS a épuisé la composante."""
+        if not self.complete:
+            raise ValueError("requête hors des cibles du DistanceField")
+
+    def distance_to(self, goal_i, goal_j, goal_o=None):
+        """
+        (Champ avant) Nombre de commandes jusqu'à (goal_i, goal_j), ou
+        jusqu'à l'état (goal_i, goal_j, goal_o), ou -1.
+        """
+        tables = self.tables
+        if not endpoints_ok(tables, goal_i, goal_j, goal_i, goal_j):
+            return -1
+        base = (goal_i * tables.W + goal_j) * 4
+        if goal_o is None:
+            ds = [d for d in self.dist[base:base + 4] if d >= 0]
+        else:
+            ds = [d for d in self.dist[base + goal_o:base + goal_o + 1] if d >= 0]
+        if not ds:
+            self._check_complete()
+            return -1
+        return min(ds)
+
+    def distance_from(self, start_i, start_j, start_o):
+        """(Champ arrière) Nombre de commandes depuis (start_i, start_j, start_o), ou -1."""
+        tables = self.tables
+        if not endpoints_ok(tables, start_i, start_j, start_i, start_j):
+            return -1
+        d = self.dist[(start_i * tables.W + start_j) * 4 + start_o]
+        if d < 0:
+            self._check_complete()
+        return d
+
+    def path_from(self, start_i, start_j, start_o):
+        """
+        (Champ arrière) Séquence minimale de commandes depuis l'état
+        (start_i, start_j, start_o) jusqu'à l'arrivée, ou None.
+        """
+        tables = self.tables
+        if not endpoints_ok(tables, start_i, start_j, start_i, start_j):
+            return None
+        s = (start_i * tables.W + start_j) * 4 + start_o
+        if self.dist[s] < 0:
+            self._check_complete()
+            return None
+        commands = []
+        nxt = self.link
+        while nxt[s] >= 0:
+            commands.append(COMMANDS[self.command[s]])
+            s = nxt[s]
+        return commands
+
+
+def grid_key(grid):
+    """
+    Clé hachable identifiant le contenu d'une grille (dimensions + cases),
+    pour regrouper les instances posées sur la même grille.
+    """
+    return len(grid), len(grid[0]), b"".join(bytes(row) for row in grid)
+
+
+def bfs_numpy(tables, start_i, start_j, start_o, goal_i, goal_j, stats=None):
+    """
+    BFS par couches vectorisé (module engine_numpy, nécessite numpy,
+    importé seulement si ce moteur est utilisé).
     """
-    outputs = []
+    import engine_numpy
+    return engine_numpy.bfs_layers(tables, start_i, start_j, start_o, goal_i, goal_j, stats=stats)
+
+
+def bfs_bitset(tables, start_i, start_j, start_o, goal_i, goal_j, stats=None):
+    """
+    BFS par couches sur des rangées codées en entiers (module engine_bitset,
+    pur Python, importé seulement si ce moteur est utilisé).
+    """
+    import engine_bitset
+    return engine_bitset.bfs_bitset(tables, start_i, start_j, start_o, goal_i, goal_j, stats=stats)
+
+
+# Moteurs de recherche sélectionnables depuis solve et la ligne de commande.
+# Tous ont la signature (tables, start_i, start_j, start_o, goal_i, goal_j,
+# stats=None).
+ENGINES = {
+    "bfs": bfs_fast,
+    "bidir": bfs_bidir,
+    "astar": astar,
+    "numpy": bfs_numpy,
+    "bitset": bfs_bitset,
+}
+
+
+class SolveCache:
+    """
+    Cache LRU des lignes de sortie de solve, indexé par une empreinte du
+    contenu de la grille et par (D1, D2, F1, F2, orientation).
+
+    maxsize : nombre maximal d'entrées (les moins récemment utilisées sont
+              évincées au-delà)
+    path    : fichier JSON optionnel, chargé à la création s'il existe et
+              réécrit par save(), pour réutiliser le cache entre deux runs.
+    hits / misses comptent les appels à get().
+    """
+
+    def __init__(self, maxsize=4096, path=None):
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    @staticmethod
+    def make_key(gk, D1, D2, F1, F2, ori_str, distance_only=False):
+        """
+        gk : clé de grille renvoyée par grid_key ; les résultats en distance
+        seule ont leur propre clé (la ligne de sortie n'est pas la même).
+        """
+        M, N, cells = gk
+        digest = hashlib.blake2b(cells, digest_size=16)
+        digest.update(f"{M}x{N}".encode())
+        key = f"{digest.hexdigest()} {D1} {D2} {F1} {F2} {ori_str}"
+        return key + " T" if distance_only else key
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        line = self._data.get(key)
+        if line is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._data.move_to_end(key)
+        return line
+
+    def put(self, key, line):
+        self._data[key] = line
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def load(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            for key, line in json.load(f):
+                self.put(key, line)
+
+    def save(self, path=None):
+        path = self.path if path is None else path
+        # Écriture dans un fichier temporaire puis renommage : un run
+        # interrompu ne laisse pas de cache tronqué
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(list(self._data.items()), f)
+        os.replace(tmp, path)
+
+
+def format_result(cmds):
+    """Ligne de sortie d'une instance : "-1" ou "T c1 c2 ... cT"."""
+    if cmds is None:
+        return "-1"
+    return str(len(cmds)) + " " + " ".join(cmds)
+
+
+def iter_solve(instances, mode="bfs", stats=None, cache=None, distance_only=False):
+    """
+    Version en flux de solve : instances peut être un générateur (voir
+    iter_instances), chaque ligne de sortie est produite dès que l'instance
+    est résolue et rien n'est conservé d'une instance à l'autre, sauf les
+    tables de la grille courante, réutilisées tant que les instances
+    consécutives portent sur la même grille.
+    Les paramètres sont ceux de solve ; il n'y a pas de regroupement par
+    DistanceField, qui demanderait de connaître les instances suivantes.
+    """
+    engine = ENGINES[mode]
+    last_key = None
+    tables = None
+
     for M, N, grid, D1, D2, F1, F2, ori_str in instances:
+        gk = grid_key(grid)
+        if gk != last_key:
+            last_key = gk
+            tables = None   # construites à la première instance non servie par le cache
+
+        st = SearchStats()
+        line = None
+        if cache is not None:
+            ck = SolveCache.make_key(gk, D1, D2, F1, F2, ori_str, distance_only)
+            line = cache.get(ck)
+
+        if line is None:
+            if tables is None:
+                tables = GridTables(grid)
+            start_o = ORI_STR_TO_ID[ori_str]
+            if distance_only:
+                T = -1
+                if tables.may_connect(D1, D2, F1, F2):
+                    T = bfs_distance(tables, D1, D2, start_o, F1, F2,
+                                     stats=None if stats is None else st)
+                line = str(T)
+            else:
+                if not tables.may_connect(D1, D2, F1, F2):
+                    cmds = None
+                elif stats is None:
+                    cmds = engine(tables, D1, D2, start_o, F1, F2)
+                else:
+                    cmds = engine(tables, D1, D2, start_o, F1, F2, stats=st)
+                line = format_result(cmds)
+            if cache is not None:
+                cache.put(ck, line)
+
+        if stats is not None:
+            stats.append(st)
+        yield line
+
+
+def plan_batch(grid, queries, mode="bfs", stats=None, tables=None, distance_only=False):
+    """
+    Planification groupée pour une flotte de robots sur UNE grille :
+      grid    : grille commune (ignorée si tables est fournie)
+      queries : liste de tuples (D1, D2, F1, F2, ori_str)
+      mode    : moteur (clé de ENGINES) pour les requêtes isolées
+      stats   : si c'est une liste, on y ajoute un SearchStats par requête
+      tables  : GridTables déjà construite pour grid, le cas échéant
+      distance_only : ne calcule que les nombres de commandes T (voir
+                      bfs_distance) ; mode est alors ignoré
+
+    Les tables ne sont construites qu'une fois (les composantes à partir
+    de la deuxième requête, cf. GridTables.may_connect) ; les
+    requêtes qui partagent un état de départ sont servies par un même
+    DistanceField avant, celles qui partagent un sommet d'arrivée par un
+    même DistanceField arrière (recherche inverse depuis l'arrivée), et les
+    requêtes restantes par le moteur choisi. Un champ s'arrête dès que
+    toutes les arrivées (ou tous les départs) de son groupe sont atteintes :
+    un lot de trajets courts depuis un même dépôt ne parcourt pas toute la
+    grille.
+
+    Retourne (résultats, temps) : résultats[k] est la séquence de commandes
+    de la requête k (ou None ; en distance seule : T, ou -1), et temps un
+    dict avec "tables" (pré-calcul), "queries" (temps par requête en
+    secondes, la construction d'un champ étant répartie entre les requêtes
+    qu'il sert) et "total".
+    """
+    t_start = time.perf_counter()
+    if tables is None:
+        tables = GridTables(grid)
+    t_tables = time.perf_counter() - t_start
+
+    engine = ENGINES[mode]
+    n = len(queries)
+    results = [-1 if distance_only else None] * n
+    times = [0.0] * n
+    per_query = [SearchStats() for _ in range(n)]
+
+    # Groupes : par état de départ d'abord, puis par sommet d'arrivée pour
+    # les requêtes restantes
+    by_start = {}
+    for k, (D1, D2, F1, F2, ori_str) in enumerate(queries):
+        if tables.may_connect(D1, D2, F1, F2):
+            by_start.setdefault((D1, D2, ORI_STR_TO_ID[ori_str]), []).append(k)
+    by_goal = {}
+    singles = []
+    for key, ks in by_start.items():
+        if len(ks) > 1:
+            continue
+        k = ks[0]
+        by_goal.setdefault(queries[k][2:4], []).append(k)
+    groups = [("start", key, ks) for key, ks in by_start.items() if len(ks) > 1]
+    for key, ks in by_goal.items():
+        if len(ks) > 1:
+            groups.append(("goal", key, ks))
+        else:
+            singles.extend(ks)
+
+    for kind, key, ks in groups:
+        t0 = time.perf_counter()
+        # Le champ s'arrête dès que les requêtes du groupe sont servies :
+        # il ne coûte pas plus qu'un BFS vers la plus lointaine
+        if kind == "start":
+            field = DistanceField.from_start(tables, *key,
+                                             targets=[queries[k][2:4] for k in ks])
+        else:
+            field = DistanceField.to_goal(tables, *key,
+                                          targets=[(queries[k][0], queries[k][1],
+                                                    ORI_STR_TO_ID[queries[k][4]]) for k in ks])
+        share = (time.perf_counter() - t0) / len(ks)
+        # Compteurs du champ attribués à la première requête qu'il sert
+        per_query[ks[0]].expanded = field.expanded
+        per_query[ks[0]].enqueued = field.enqueued
+        for k in ks:
+            t0 = time.perf_counter()
+            D1, D2, F1, F2, ori_str = queries[k]
+            if distance_only and field.reverse:
+                results[k] = field.distance_from(D1, D2, ORI_STR_TO_ID[ori_str])
+            elif distance_only:
+                results[k] = field.distance_to(F1, F2)
+            elif field.reverse:
+                results[k] = field.path_from(D1, D2, ORI_STR_TO_ID[ori_str])
+            else:
+                results[k] = field.path_to(F1, F2)
+            times[k] = share + time.perf_counter() - t0
+        del field
+
+    for k in singles:
+        t0 = time.perf_counter()
+        D1, D2, F1, F2, ori_str = queries[k]
         start_o = ORI_STR_TO_ID[ori_str]
-        cmds = bfs(grid, D1, D2, start_o, F1, F2)
-        if cmds is None:
-            outputs.append("-1")
+        if distance_only:
+            results[k] = bfs_distance(tables, D1, D2, start_o, F1, F2,
+                                      stats=None if stats is None else per_query[k])
+        elif stats is None:
+            results[k] = engine(tables, D1, D2, start_o, F1, F2)
         else:
-            T = len(cmds)
-            outputs.append(str(T) + " " + " ".join(cmds))
+            results[k] = engine(tables, D1, D2, start_o, F1, F2, stats=per_query[k])
+        times[k] = time.perf_counter() - t0
+
+    if stats is not None:
+        stats.extend(per_query)
+    timings = {
+        "tables": t_tables,
+        "queries": times,
+        "total": time.perf_counter() - t_start,
+    }
+    return results, timings
+
+
+def solve(instances, mode="bfs", stats=None, cache=None, workers=1, chunksize=32,
+          distance_only=False):
+    """
+    instances : liste de tuples (M, N, grid, D1, D2, F1, F2, ori_str)
+    mode : nom du moteur de recherche (clé de ENGINES)
+    stats : si c'est une liste, on y ajoute le SearchStats du moteur pour
+            chaque instance
+    cache : SolveCache optionnel, consulté avant tout calcul et complété
+            avec les nouveaux résultats
+    workers : nombre de processus ; au-delà de 1, voir iter_solve_parallel
+              (paquets de chunksize instances, résolus instance par
+              instance comme iter_solve)
+    distance_only : chaque ligne de sortie est seulement T (ou -1), calculé
+                    sans reconstruire de chemin (voir bfs_distance)
+    Retourne les lignes de sortie sous forme de liste de chaînes.
+    """
+    if workers != 1:
+        return list(iter_solve_parallel(instances, mode=mode, stats=stats, cache=cache,
+                                        workers=workers, chunksize=chunksize,
+                                        distance_only=distance_only))
+
+    # Les instances sont regroupées par grille identique (grid_key) et
+    # chaque groupe est résolu par plan_batch (tables construites une fois,
+    # DistanceField partagés). Les instances déjà en cache, ou répétées plus
+    # haut dans le lot, ne sont pas recalculées.
+    outputs = [None] * len(instances)
+    per_instance = [SearchStats() for _ in instances]
+    by_grid = {}
+    cache_keys = [None] * len(instances)
+    repeats = []
+    first = {}
+    for k, (M, N, grid, D1, D2, F1, F2, ori_str) in enumerate(instances):
+        gk = grid_key(grid)
+        if cache is not None:
+            ck = cache_keys[k] = SolveCache.make_key(gk, D1, D2, F1, F2, ori_str,
+                                                     distance_only)
+            if ck in first:
+                repeats.append(k)
+                continue
+            first[ck] = k
+            line = cache.get(ck)
+            if line is not None:
+                outputs[k] = line
+                continue
+        entry = by_grid.get(gk)
+        if entry is None:
+            entry = by_grid[gk] = (grid, [])
+        entry[1].append(k)
+
+    for gk in list(by_grid):
+        grid, indices = by_grid.pop(gk)
+        queries = [instances[k][3:] for k in indices]
+        grid_stats = [] if stats is not None else None
+        results, _ = plan_batch(grid, queries, mode=mode, stats=grid_stats,
+                                distance_only=distance_only)
+        for n, (k, cmds) in enumerate(zip(indices, results)):
+            outputs[k] = str(cmds) if distance_only else format_result(cmds)
+            if cache is not None:
+                cache.put(cache_keys[k], outputs[k])
+            if stats is not None:
+                per_instance[k] = grid_stats[n]
+
+    for k in repeats:
+        ck = cache_keys[k]
+        line = cache.get(ck)
+        if line is None:
+            # Entrée évincée entre-temps (cache plus petit que le lot)
+            line = outputs[first[ck]]
+        outputs[k] = line
+
+    if stats is not None:
+        stats.extend(per_instance)
     return outputs
 
 
-def read_input():
+def iter_instances(stream=None):
     """
-    Lit toutes les instances depuis stdin.
-    Retourne une liste d'instances.
+    Lit les instances une par une depuis stream (stdin par défaut) et les
+    produit au fur et à mesure (générateur) : seule la grille en cours de
+    lecture est en mémoire.
+    Mêmes règles que la lecture d'origine : lignes vides ignorées, arrêt sur
+    "0 0", orientation mise en minuscules.
     """
-    lines = [line.strip() for line in sys.stdin if line.strip() != ""] #lit toutes les lignes non vides depuis l'entrée standard, lines est donc une liste de toutes les lignes utiles
-    idx = 0
-    instances = []
+    if stream is None:
+        stream = sys.stdin
+    lines = (line.strip() for line in stream)
+    lines = (line for line in lines if line != "") #lignes non vides, lues à la demande
 
-    while idx < len(lines):
-        parts = lines[idx].split() #lit la ligne courante et la divise en parties
-        idx += 1
+    for line in lines:
+        parts = line.split() #lit la ligne courante et la divise en parties
         if len(parts) < 2: #si la ligne ne contient pas au moins 2 parties, on l'ignore et on passe à la suivante
             continue
         M, N = map(int, parts[:2]) #convertit les 2 premières parties en entiers M et N
         if M == 0 and N == 0: #condition d'arrêt : dernière ligne avec 0 0
-            break
+            return
 
-        grid = []
-        #on va lire M lignes pour construire la grille
-        for _ in range(M):
-            row = list(map(int, lines[idx].split()))
-            idx += 1
-            grid.append(row)
+        try:
+            grid = []
+            #on va lire M lignes pour construire la grille
+            for _ in range(M):
+                grid.append(list(map(int, next(lines).split())))
 
-        # Ligne de départ, arrivée et orientation
-        parts = lines[idx].split()
-        idx += 1
+            # Ligne de départ, arrivée et orientation
+            parts = next(lines).split()
+        except StopIteration:
+            raise ValueError(f"instance {M} {N} incomplète en fin de fichier") from None
         D1, D2, F1, F2 = map(int, parts[:4])
         ori_str = parts[4].lower()
 
-        instances.append((M, N, grid, D1, D2, F1, F2, ori_str)) # l'instance complète est ajoutée à la liste
+        yield (M, N, grid, D1, D2, F1, F2, ori_str)
+
+
+def pack_instance(instance, gk=None):
+    """
+    Forme compacte d'une instance pour l'envoi à un processus : la grille
+    devient une seule chaîne bytes de M * N cases (cf. grid_key), bien moins
+    coûteuse à sérialiser qu'une liste de listes d'entiers.
+    """
+    M, N, grid, D1, D2, F1, F2, ori_str = instance
+    if gk is None:
+        gk = grid_key(grid)
+    return (M, N, gk[2], D1, D2, F1, F2, ori_str)
+
+
+def unpack_instance(packed):
+    """Inverse de pack_instance : la grille est une liste de rangées bytes."""
+    M, N, cells, D1, D2, F1, F2, ori_str = packed
+    grid = [cells[i * N:(i + 1) * N] for i in range(M)]
+    return (M, N, grid, D1, D2, F1, F2, ori_str)
+
+
+def _solve_packed_chunk(packed, mode, with_stats, distance_only=False):
+    """
+    Tâche exécutée par un processus de iter_solve_parallel : les instances
+    sont résolues une à une par iter_solve, comme en série, pour que les
+    lignes ne dépendent ni de workers ni de chunksize.
+    """
+    stats = [] if with_stats else None
+    outputs = list(iter_solve(map(unpack_instance, packed), mode=mode, stats=stats,
+                              distance_only=distance_only))
+    return outputs, stats
+
+
+def iter_solve_parallel(instances, mode="bfs", stats=None, cache=None,
+                        workers=None, chunksize=32, distance_only=False):
+    """
+    Résolution en parallèle sur plusieurs processus, dans l'ordre d'entrée :
+      - les instances (liste ou générateur) sont découpées en paquets de
+        chunksize instances consécutives,
+      - les instances déjà en cache sont servies ici, les autres sont
+        envoyées sous forme compacte (pack_instance) à un processus qui les
+        résout avec iter_solve, sans regroupement par DistanceField : les
+        lignes produites sont exactement celles de iter_solve en série,
+      - au plus 2 * workers paquets sont en cours à la fois, pour garder une
+        mémoire bornée sur les longs flux.
+    workers : nombre de processus (défaut : nombre de cœurs).
+    Les autres paramètres sont ceux de solve ; produit les lignes de sortie.
+    """
+    workers = workers or os.cpu_count() or 1
+    pending = deque()
+
+    def finish(job):
+        lines, todo, keys, chunk_stats, future = job
+        if future is not None:
+            outputs, worker_stats = future.result()
+            for n, (k, ck, line) in enumerate(zip(todo, keys, outputs)):
+                lines[k] = line
+                if cache is not None:
+                    cache.put(ck, line)
+                if stats is not None:
+                    chunk_stats[k] = worker_stats[n]
+        if stats is not None:
+            stats.extend(chunk_stats)
+        return lines
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        it = iter(instances)
+        while True:
+            chunk = list(itertools.islice(it, chunksize))
+            if not chunk:
+                break
+
+            lines = [None] * len(chunk)
+            chunk_stats = [SearchStats() for _ in chunk]
+            todo = []
+            keys = []
+            packed = []
+            for k, inst in enumerate(chunk):
+                M, N, grid, D1, D2, F1, F2, ori_str = inst
+                gk = grid_key(grid)
+                ck = None
+                if cache is not None:
+                    ck = SolveCache.make_key(gk, D1, D2, F1, F2, ori_str, distance_only)
+                    line = cache.get(ck)
+                    if line is not None:
+                        lines[k] = line
+                        continue
+                todo.append(k)
+                keys.append(ck)
+                packed.append(pack_instance(inst, gk))
+
+            future = None
+            if packed:
+                future = executor.submit(_solve_packed_chunk, packed, mode, stats is not None,
+                                         distance_only)
+            pending.append((lines, todo, keys, chunk_stats, future))
+
+            while len(pending) > 2 * workers:
+                yield from finish(pending.popleft())
 
-    return instances
+        while pending:
+            yield from finish(pending.popleft())
+
+
+# Conversion d'une ligne de grille compactée (b"0101...") en octets 0 / 1
+_ASCII_TO_CELL = bytes.maketrans(b"01", b"\x00\x01")
+
+
+def _parse_grid_row(line, N):
+    """
+    Convertit une ligne de grille (bytes) en une rangée de N cases sans
+    passer par un int Python par case : on retire les séparateurs, puis on
+    traduit '0' / '1' en octets 0 / 1. Le résultat (bytes) s'indexe comme la
+    liste d'entiers de iter_instances (row[c] == 1 pour un obstacle).
+    Si la ligne contient autre chose que des 0 / 1 d'un chiffre, on revient
+    à la conversion entier par entier.
+    """
+    compact = line.translate(None, b" \t\r\n")
+    if len(compact) == N and not compact.strip(b"01"):
+        return compact.translate(_ASCII_TO_CELL)
+    return list(map(int, line.split()))
+
+
+def iter_instances_fast(source):
+    """
+    Lecteur rapide du format d'instances, sur des octets :
+      source : objet binaire muni de readline() (fichier ouvert en "rb",
+               sys.stdin.buffer, mmap) ou bytes.
+    Mêmes règles et même résultat que iter_instances (lignes vides
+    ignorées, arrêt sur "0 0", orientation en minuscules), mais chaque
+    ligne de grille est une chaîne bytes de cases 0 / 1.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    lines = (line.strip() for line in iter(source.readline, b""))
+    lines = (line for line in lines if line)
+
+    for line in lines:
+        parts = line.split()
+        if len(parts) < 2:
+            continue
+        M, N = int(parts[0]), int(parts[1])
+        if M == 0 and N == 0:
+            return
+
+        try:
+            grid = [_parse_grid_row(next(lines), N) for _ in range(M)]
+            parts = next(lines).split()
+        except StopIteration:
+            raise ValueError(f"instance {M} {N} incomplète en fin de fichier") from None
+        D1, D2, F1, F2 = map(int, parts[:4])
+        ori_str = parts[4].decode().lower()
+
+        yield (M, N, grid, D1, D2, F1, F2, ori_str)
+
+
+def read_input_fast(path):
+    """
+    Lit toutes les instances du fichier path via un mmap et le lecteur
+    rapide. Retourne une liste d'instances (cf. read_input).
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            return list(iter_instances_fast(m))
+
+
+# Signature des conteneurs binaires d'instances (cf. binary_format.py)
+BINARY_MAGIC = b"RBTG"
+
+
+def is_binary(path):
+    """
+    Vrai si path commence par la signature d'un conteneur binaire : seul ce
+    cas demande d'importer binary_format (qui importe robot à son tour).
+    """
+    with open(path, "rb") as f:
+        return f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+
+def read_input():
+    """
+    Lit toutes les instances depuis stdin.
+    Retourne une liste d'instances.
+    """
+    return list(iter_instances())
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Séquences minimales de commandes du robot (instances lues sur stdin)."
+    )
+    parser.add_argument(
+        "--mode", choices=sorted(ENGINES), default="bfs",
+        help="moteur de recherche (défaut : bfs)",
+    )
+    parser.add_argument(
+        "--input", metavar="FICHIER",
+        help="fichier d'instances (lu par mmap) au lieu de stdin : texte, ou "
+             "conteneur binaire (binary_format.py), reconnu à sa signature",
+    )
+    parser.add_argument(
+        "--distance-only", action="store_true",
+        help="n'écrit que le nombre de commandes T (ou -1), sans chemin",
+    )
+    parser.add_argument(
+        "--skip", type=int, default=0,
+        help="ignore les K premières instances",
+    )
+    parser.add_argument(
+        "--limit", type=int,
+        help="ne résout que C instances (après --skip)",
+    )
+    parser.add_argument(
+        "--stats", action="store_true",
+        help="affiche sur stderr le nombre d'états développés par instance",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="nombre de processus de résolution (0 : un par cœur, défaut : 1)",
+    )
+    parser.add_argument(
+        "--chunksize", type=int, default=32,
+        help="instances envoyées à la fois à un processus (défaut : 32)",
+    )
+    parser.add_argument(
+        "--cache", metavar="FICHIER",
+        help="cache des résultats (JSON) conservé entre deux exécutions",
+    )
+    parser.add_argument(
+        "--cache-size", type=int, default=4096,
+        help="nombre maximal d'entrées du cache (défaut : 4096)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    stats = [] if args.stats else None
+    cache = SolveCache(args.cache_size, args.cache) if args.cache else None
+
+    # Lecture et résolution en flux : chaque résultat est écrit (et vidé)
+    # dès qu'il est calculé, seule l'instance courante est en mémoire
+    out = sys.stdout
+    stop = None if args.limit is None else args.skip + args.limit
+    with contextlib.ExitStack() as stack:
+        if args.input and is_binary(args.input):
+            # Conteneur binaire : accès direct aux instances demandées,
+            # celles que l'on saute ne sont pas lues
+            import binary_format
+            corpus = stack.enter_context(binary_format.BinaryCorpus(args.input))
+            instances = corpus.iter_range(args.skip, stop)
+        else:
+            source = sys.stdin.buffer
+            if args.input:
+                f = stack.enter_context(open(args.input, "rb"))
+                if os.fstat(f.fileno()).st_size > 0:
+                    source = stack.enter_context(
+                        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+                else:
+                    source = f
+            instances = iter_instances_fast(source)
+            if args.skip or stop is not None:
+                instances = itertools.islice(instances, args.skip, stop)
+        if args.workers == 1:
+            results = iter_solve(instances, mode=args.mode, stats=stats, cache=cache,
+                                 distance_only=args.distance_only)
+        else:
+            results = iter_solve_parallel(instances, mode=args.mode, stats=stats, cache=cache,
+                                          workers=args.workers or None,
+                                          chunksize=args.chunksize,
+                                          distance_only=args.distance_only)
+        for line in results:
+            out.write(line + "\n")
+            out.flush()
 
+    if cache is not None:
+        cache.save()
 
-def main():
-    instances = read_input()
-    outputs = solve(instances)
-    for line in outputs:
-        print(line)
+    if stats is not None:
+        for k, st in enumerate(stats, 1):
+            print(f"instance {k} : {st.expanded} états développés, {st.enqueued} mis en file, "
+                  f"file max {st.peak_queue}, recherche {st.search_time * 1000:.3f} ms, "
+                  f"reconstruction {st.path_time * 1000:.3f} ms, "
+                  f"mémoire {st.memory / 1024:.1f} ko", file=sys.stderr)
+        total = sum(st.expanded for st in stats)
+        print(f"total : {total} états développés ({args.mode})", file=sys.stderr)
+        if cache is not None:
+            print(f"cache : {cache.hits} succès, {cache.misses} échecs", file=sys.stderr)
 
 
 if __name__ == "__main__":
+    # Les modules importés à la demande (binary_format, engine_numpy,
+    # engine_bitset) font « import robot » : on leur donne ce module-ci
+    # plutôt que de le charger une seconde fois
+    sys.modules.setdefault("robot", sys.modules[__name__])
     main()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import hashlib
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import robot
+
+
+class MapStore:
+    """
+    Grilles enregistrées auprès du service : map_id -> GridTables, avec
+    les tables et les composantes construites une seule fois à
+    l'enregistrement. map_id est l'empreinte de la grille : enregistrer
+    deux fois la même grille rend le même identifiant. Au-delà de maxsize
+    grilles, la moins récemment utilisée est oubliée.
+
+    Les requêtes sont traitées dans des threads (cf. serve_connection) :
+    chaque accès à maps se fait sous verrou, pour qu'une grille oubliée
+    entre la lecture et move_to_end ne lève pas KeyError. Les tables sont
+    construites hors du verrou.
+    """
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.maps = OrderedDict()
+        self.lock = threading.Lock()
+
+    def register(self, grid):
+        map_id = hashlib.blake2b(robot.grid_key(grid)[2], digest_size=8,
+                                 person=str(len(grid)).encode()).hexdigest()
+        with self.lock:
+            if map_id in self.maps:
+                self.maps.move_to_end(map_id)
+                return map_id
+        tables = robot.GridTables(grid)
+        tables.components()
+        with self.lock:
+            self.maps[map_id] = tables
+            self.maps.move_to_end(map_id)
+            if len(self.maps) > self.maxsize:
+                self.maps.popitem(last=False)
+        return map_id
+
+    def get(self, map_id):
+        with self.lock:
+            tables = self.maps.get(map_id)
+            if tables is None:
+                raise KeyError(f"grille inconnue : {map_id}")
+            self.maps.move_to_end(map_id)
+            return tables
+
+    def unregister(self, map_id):
+        with self.lock:
+            return self.maps.pop(map_id, None) is not None
+
+
+def parse_grid(rows):
+    """
+    Grille d'une requête : liste de chaînes "0101..." ou de listes 0 / 1.
+    Retourne une liste de bytes (cf. robot.iter_instances_fast).
+    """
+    if not rows:
+        raise ValueError("grille vide")
+    grid = []
+    for row in rows:
+        if isinstance(row, str):
+            data = row.replace(" ", "").encode("ascii")
+            if data.strip(b"01"):
+                raise ValueError("une rangée ne doit contenir que des 0 / 1")
+            grid.append(data.translate(robot._ASCII_TO_CELL))
+        else:
+            grid.append(bytes(row))
+    if any(len(row) != len(grid[0]) for row in grid):
+        raise ValueError("rangées de longueurs différentes")
+    return grid
+
+
+def handle(store, request):
+    """
+    Traite une requête (dict décodé d'une ligne JSON) et retourne la
+    réponse (dict). Opérations ("op") :
+      - "register" : {"grid": [...]} -> {"map_id": ...}
+      - "query" : {"map_id": ..., "queries": [[D1, D2, F1, F2, orientation], ...],
+                   "mode": moteur (défaut "bfs")}
+                  -> {"results": [ligne de sortie de robot.py, ...],
+                      "query_ms": [temps par requête]}
+      - "unregister" : {"map_id": ...} -> {"removed": bool}
+      - "ping" -> {}
+    Toute réponse contient "ok", "time_ms" (temps de traitement) et l'"id"
+    de la requête s'il y en a un ; en cas d'erreur, quelle qu'elle soit,
+    "ok" vaut false et "error" donne le message.
+    """
+    t0 = time.perf_counter()
+    response = {"ok": True}
+    if "id" in request:
+        response["id"] = request["id"]
+    try:
+        op = request.get("op")
+        if op == "register":
+            response["map_id"] = store.register(parse_grid(request.get("grid")))
+        elif op == "query":
+            tables = store.get(request.get("map_id"))
+            mode = request.get("mode", "bfs")
+            if mode not in robot.ENGINES:
+                raise ValueError(f"moteur inconnu : {mode}")
+            queries = []
+            for q in request.get("queries", []):
+                D1, D2, F1, F2, ori_str = q
+                # Même tolérance que la lecture des instances (cf. robot.iter_instances)
+                ori_str = str(ori_str).lower()
+                if ori_str not in robot.ORI_STR_TO_ID:
+                    raise ValueError(f"orientation invalide : {ori_str}")
+                queries.append((int(D1), int(D2), int(F1), int(F2), ori_str))
+            results, timings = robot.plan_batch(None, queries, mode=mode, tables=tables)
+            response["results"] = [robot.format_result(cmds) for cmds in results]
+            response["query_ms"] = [t * 1000 for t in timings["queries"]]
+        elif op == "unregister":
+            response["removed"] = store.unregister(request.get("map_id"))
+        elif op != "ping":
+            raise ValueError(f"opération inconnue : {op}")
+    except (KeyError, ValueError, TypeError) as e:
+        response = {"ok": False, "error": str(e.args[0] if e.args else e)}
+        if "id" in request:
+            response["id"] = request["id"]
+    except Exception as e:
+        # Toute autre erreur (p. ex. OverflowError sur int(1e999)) doit
+        # aussi produire une réponse, sinon la requête resterait sans réponse
+        response = {"ok": False, "error": f"{type(e).__name__} : {e}"}
+        if "id" in request:
+            response["id"] = request["id"]
+    response["time_ms"] = (time.perf_counter() - t0) * 1000
+    return response
+
+
+def decode(line):
+    """Ligne JSON -> requête (dict), ou None et une réponse d'erreur."""
+    try:
+        request = json.loads(line)
+    except ValueError as e:
+        return None, {"ok": False, "error": f"JSON invalide : {e}"}
+    if not isinstance(request, dict):
+        return None, {"ok": False, "error": "la requête doit être un objet JSON"}
+    return request, None
+
+
+async def serve_connection(store, reader, writer):
+    """
+    Une connexion : une requête JSON par ligne, une réponse JSON par ligne.
+    Chaque requête est traitée dans un thread (les recherches ne bloquent
+    pas la boucle asyncio) et les requêtes d'une même connexion peuvent se
+    chevaucher : les réponses sont écrites dès qu'elles sont prêtes, à
+    associer aux requêtes par leur "id". Les recherches, en Python pur,
+    gardent le GIL : les threads évitent qu'une longue requête bloque les
+    autres connexions, mais les calculs de plusieurs requêtes ne
+    s'exécutent pas en parallèle (pour cela, lancer plusieurs services).
+    """
+    loop = asyncio.get_running_loop()
+    lock = asyncio.Lock()
+    tasks = set()
+
+    async def answer(request):
+        response = await loop.run_in_executor(None, handle, store, request)
+        async with lock:
+            writer.write(json.dumps(response).encode() + b"\n")
+            await writer.drain()
+
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            request, error = decode(line)
+            if request is None:
+                async with lock:
+                    writer.write(json.dumps(error).encode() + b"\n")
+                    await writer.drain()
+                continue
+            task = asyncio.create_task(answer(request))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def serve_tcp(store, host, port):
+    server = await asyncio.start_server(
+        lambda r, w: serve_connection(store, r, w), host, port, limit=2 ** 26)
+    addr = server.sockets[0].getsockname()
+    print(f"service à l'écoute sur {addr[0]}:{addr[1]}", file=sys.stderr, flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def serve_stdio(store, stdin=sys.stdin, stdout=sys.stdout):
+    """Même protocole sur l'entrée / la sortie standard, requête par requête."""
+    for line in stdin:
+        if not line.strip():
+            continue
+        request, error = decode(line)
+        response = error if request is None else handle(store, request)
+        stdout.write(json.dumps(response) + "\n")
+        stdout.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Service de résolution : grilles préchargées, requêtes JSON par ligne.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--stdio", action="store_true",
+                        help="lit les requêtes sur stdin au lieu d'ouvrir un socket")
+    parser.add_argument("--max-maps", type=int, default=64,
+                        help="nombre maximal de grilles gardées en mémoire")
+    args = parser.parse_args(argv)
+
+    store = MapStore(args.max_maps)
+    if args.stdio:
+        serve_stdio(store)
+    else:
+        try:
+            asyncio.run(serve_tcp(store, args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import json
+import random
+import socket
+import time
+from statistics import mean
+
+import benchmark
+
+
+def grid_rows(grid):
+    """Grille (rangées de cases 0 / 1) -> liste de chaînes "0101..." pour le service."""
+    return ["".join("1" if c else "0" for c in row) for row in grid]
+
+
+class ServiceClient:
+    """
+    Client synchrone minimal du service (service.py) :
+        with ServiceClient() as client:
+            map_id = client.register(grid)
+            results = client.query(map_id, [(D1, D2, F1, F2, "nord"), ...])
+    Les méthodes lèvent RuntimeError si le service répond une erreur.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8765):
+        self.sock = socket.create_connection((host, port))
+        self.file = self.sock.makefile("rwb")
+        self.next_id = 0
+
+    def request(self, **request):
+        """Envoie une requête et retourne la réponse complète (dict)."""
+        self.next_id += 1
+        request["id"] = self.next_id
+        self.file.write(json.dumps(request).encode() + b"\n")
+        self.file.flush()
+        response = json.loads(self.file.readline())
+        if not response.get("ok"):
+            raise RuntimeError(response.get("error"))
+        return response
+
+    def register(self, grid):
+        return self.request(op="register", grid=grid_rows(grid))["map_id"]
+
+    def query(self, map_id, queries, mode="bfs"):
+        """Lignes de sortie (format de robot.py) des requêtes (D1, D2, F1, F2, orientation)."""
+        return self.request(op="query", map_id=map_id, queries=[list(q) for q in queries],
+                            mode=mode)["results"]
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+async def run_client(host, port, map_id, queries, requests, batch, latencies):
+    """Un client du générateur de charge : requests requêtes de batch trajets."""
+    reader, writer = await asyncio.open_connection(host, port, limit=2 ** 26)
+    try:
+        for k in range(requests):
+            chunk = [queries[(k * batch + n) % len(queries)] for n in range(batch)]
+            t0 = time.perf_counter()
+            writer.write(json.dumps({"op": "query", "id": k, "map_id": map_id,
+                                     "queries": chunk}).encode() + b"\n")
+            await writer.drain()
+            response = json.loads(await reader.readline())
+            if not response.get("ok"):
+                raise RuntimeError(response.get("error"))
+            latencies.append((time.perf_counter() - t0, response["time_ms"] / 1000))
+    finally:
+        writer.close()
+
+
+async def load_test(args):
+    rng = random.Random(args.seed)
+    M, N, grid, _, _, _ = benchmark.generate_instance(args.size, args.size,
+                                                      int(args.size ** 2 * args.density), rng)
+    with ServiceClient(args.host, args.port) as client:
+        t0 = time.perf_counter()
+        map_id = client.register(grid)
+        t_register = time.perf_counter() - t0
+
+    queries = []
+    for _ in range(max(args.batch * args.requests, 1)):
+        queries.append((rng.randrange(1, M), rng.randrange(1, N), rng.randrange(1, M),
+                        rng.randrange(1, N), rng.choice(benchmark.ORIENTATIONS)))
+
+    latencies = []
+    t0 = time.perf_counter()
+    await asyncio.gather(*(run_client(args.host, args.port, map_id, queries, args.requests,
+                                      args.batch, latencies)
+                           for _ in range(args.clients)))
+    elapsed = time.perf_counter() - t0
+
+    total = sorted(t for t, _ in latencies)
+    server = [s for _, s in latencies]
+
+    def pct(p):
+        return total[min(len(total) - 1, int(p * len(total)))] * 1000
+
+    print(f"enregistrement : {t_register * 1000:.1f} ms (grille {M}x{N})")
+    print(f"requêtes       : {len(total)} en {elapsed:.2f} s ({len(total) / elapsed:.1f} req/s, "
+          f"{args.batch} trajets chacune)")
+    print(f"latence (ms)   : médiane {pct(0.5):.2f}, p90 {pct(0.9):.2f}, p99 {pct(0.99):.2f}, "
+          f"max {total[-1] * 1000:.2f}")
+    print(f"temps serveur  : {mean(server) * 1000:.2f} ms en moyenne")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Générateur de charge pour service.py.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--clients", type=int, default=4, help="connexions simultanées")
+    parser.add_argument("--requests", type=int, default=50, help="requêtes par client")
+    parser.add_argument("--batch", type=int, default=1, help="trajets par requête")
+    parser.add_argument("--size", type=int, default=100, help="taille N de la grille N x N")
+    parser.add_argument("--density", type=float, default=0.05, help="proportion d'obstacles")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    asyncio.run(load_test(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Vérification automatique de GridTables et bfs_fast contre les fonctions de
+référence vertex_ok / edge_ok / bfs, sur des grilles aléatoires à graine
+fixe. Se lance avec pytest, ou directement : python test_equivalence.py
+"""
+import itertools
+import random
+
+import benchmark
+import robot
+
+SEEDS = range(200)
+
+
+def random_grid(rng):
+    """Grille de benchmark.generate_instance, de taille et densité tirées par rng."""
+    M, N = rng.randint(4, 14), rng.randint(4, 14)
+    density = rng.choice((0.0, 0.1, 0.2, 0.35))
+    return benchmark.generate_instance(M, N, int(density * M * N), rng)[2]
+
+
+def tiny_grids():
+    """Toutes les grilles d'au plus 3 x 3 (trop petites pour generate_instance)."""
+    for M in (1, 2, 3):
+        for N in (1, 2, 3):
+            for cells in itertools.product((0, 1), repeat=M * N):
+                yield [list(cells[i * N:(i + 1) * N]) for i in range(M)]
+
+
+def all_grids():
+    """Grilles des tests : une par graine de SEEDS, puis les petites grilles."""
+    return itertools.chain((random_grid(random.Random(seed)) for seed in SEEDS), tiny_grids())
+
+
+def test_tables_match_reference():
+    for k, grid in enumerate(all_grids()):
+        M, N = len(grid), len(grid[0])
+        t = robot.GridTables(grid)
+        W = t.W
+        for i in range(M + 1):
+            for j in range(N + 1):
+                v = i * W + j
+                assert t.vertex[v] == robot.vertex_ok(i, j, grid), (k, i, j)
+                if j < N:
+                    assert t.hrail[v] == robot.edge_ok(i, j, 0, 1, grid), (k, i, j)
+                if i < M:
+                    assert t.vrail[v] == robot.edge_ok(i, j, 1, 0, grid), (k, i, j)
+
+
+def test_bfs_fast_matches_bfs():
+    rng = random.Random(0)
+    for k, grid in enumerate(all_grids()):
+        M, N = len(grid), len(grid[0])
+        t = robot.GridTables(grid)
+        for _ in range(5):
+            D1, D2, F1, F2 = (rng.randint(0, M), rng.randint(0, N),
+                              rng.randint(0, M), rng.randint(0, N))
+            o = rng.randrange(4)
+            assert robot.bfs_fast(t, D1, D2, o, F1, F2) == robot.bfs(grid, D1, D2, o, F1, F2), \
+                (k, D1, D2, o, F1, F2)
+
+
+if __name__ == "__main__":
+    test_tables_match_reference()
+    test_bfs_fast_matches_bfs()
+    print("ok")
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+HierarchicalPlanner contre robot.bfs sur les instances de
+verification.random_case, pour plusieurs tailles de bloc : en mode exact
+même longueur, en mode rapide une séquence légale, jamais plus courte.
+Se lance avec pytest, ou directement : python test_hierarchical.py
+"""
+import random
+
+import benchmark
+import hierarchical
+import robot
+import verification
+
+SEEDS = range(300)
+
+
+def test_exact_and_fast_modes():
+    for seed in SEEDS:
+        grid, query = verification.random_case(seed)
+        tables = robot.GridTables(grid)
+        reference = robot.bfs(grid, *query)
+        for K in (3, 4, 5, 8):
+            planner = hierarchical.HierarchicalPlanner(grid, K=K, tables=tables)
+            for exact in (True, False):
+                error = verification.check_result(grid, query, planner.plan(*query, exact=exact),
+                                                  reference, optimal=exact)
+                assert error is None, (seed, K, exact, error)
+
+
+def test_larger_grid():
+    # Plusieurs blocs de la taille par défaut, chemins de plusieurs blocs
+    rng = random.Random(7)
+    grid = benchmark.generate_instance(60, 60, 360, rng)[2]
+    tables = robot.GridTables(grid)
+    planner = hierarchical.HierarchicalPlanner(grid, K=16, tables=tables)
+    for _ in range(10):
+        query = (rng.randrange(1, 60), rng.randrange(1, 60), rng.randrange(4),
+                 rng.randrange(1, 60), rng.randrange(1, 60))
+        reference = robot.bfs_fast(tables, *query)
+        for exact in (True, False):
+            error = verification.check_result(grid, query, planner.plan(*query, exact=exact),
+                                              reference, optimal=exact)
+            assert error is None, (query, exact, error)
+
+
+def test_block_size_must_allow_one_advance():
+    try:
+        hierarchical.HierarchicalPlanner([[0]], K=2)
+    except ValueError:
+        return
+    raise AssertionError("K = 2 accepté")
+
+
+if __name__ == "__main__":
+    test_exact_and_fast_modes()
+    test_larger_grid()
+    test_block_size_must_allow_one_advance()
+    print("ok")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Replanification incrémentale : après des cases basculées une à une,
+GridTables.update_cell doit donner les tables d'une reconstruction
+complète, et IncrementalPlanner la longueur de robot.bfs sur la grille
+courante, avec une séquence légale.
+Se lance avec pytest, ou directement : python test_incremental.py
+"""
+import random
+
+import incremental
+import robot
+import verification
+
+SEEDS = range(150)
+
+
+def test_update_cell_matches_rebuild():
+    for seed in SEEDS:
+        rng = random.Random(seed)
+        grid, _ = verification.random_case(seed)
+        grid = [list(row) for row in grid]
+        tables = robot.GridTables(grid)
+        for _ in range(8):
+            r, c = rng.randrange(len(grid)), rng.randrange(len(grid[0]))
+            grid[r][c] ^= 1
+            tables.update_cell(grid, r, c)
+            fresh = robot.GridTables(grid)
+            for name in ("vertex", "hrail", "vrail", "reach"):
+                assert getattr(tables, name) == getattr(fresh, name), (seed, r, c, name)
+
+
+def test_replanning_matches_bfs():
+    for seed in SEEDS:
+        rng = random.Random(seed)
+        grid, query = verification.random_case(seed)
+        D1, D2, o, F1, F2 = query
+        planner = incremental.IncrementalPlanner(grid, D1, D2, o, F1, F2)
+        current = [list(row) for row in grid]
+        error = verification.check_result(current, query, planner.plan(), robot.bfs(current, *query))
+        assert error is None, (seed, error)
+        for k in range(8):
+            r, c = rng.randrange(len(grid)), rng.randrange(len(grid[0]))
+            result = planner.toggle(r, c)
+            current[r][c] ^= 1
+            error = verification.check_result(current, query, result, robot.bfs(current, *query))
+            assert error is None, (seed, k, error)
+
+
+if __name__ == "__main__":
+    test_update_cell_matches_rebuild()
+    test_replanning_matches_bfs()
+    print("ok")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+La sortie de robot.py ne doit pas dépendre de --workers ni de --chunksize :
+on compare octet par octet la sortie série et des sorties parallèles sur un
+fichier où plusieurs instances partagent une grille (cas où un regroupement
+par DistanceField pourrait choisir une autre séquence de même longueur).
+Se lance avec pytest, ou directement : python test_parallel.py
+"""
+import contextlib
+import io
+import os
+import random
+import tempfile
+
+import benchmark
+import robot
+
+
+def write_corpus(path, seed=1, grids=10, per_grid=10, size=20):
+    rng = random.Random(seed)
+    with open(path, "wb") as f:
+        for _ in range(grids):
+            M, N, grid, start, _, ori = benchmark.generate_instance(size, size, 2 * size, rng)
+            for _ in range(per_grid):
+                if rng.random() < 0.5:
+                    start = (rng.randrange(1, size - 1), rng.randrange(1, size - 1))
+                end = (rng.randrange(1, size - 1), rng.randrange(1, size - 1))
+                benchmark.write_instance_block(f, M, N, grid, start, end, ori)
+        f.write(b"0 0\n")
+
+
+def run_main(argv):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        robot.main(argv)
+    return out.getvalue()
+
+
+def test_workers_do_not_change_output():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "entree.txt")
+        write_corpus(path)
+        for extra in ([], ["--distance-only"]):
+            serial = run_main(["--input", path] + extra)
+            assert serial.count("\n") == 100
+            for workers, chunksize in ((2, 32), (3, 5), (2, 1)):
+                parallel = run_main(["--input", path, "--workers", str(workers),
+                                     "--chunksize", str(chunksize)] + extra)
+                assert parallel == serial, (extra, workers, chunksize)
+
+
+if __name__ == "__main__":
+    test_workers_do_not_change_output()
+    print("ok")
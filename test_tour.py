@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tournées : plan_tour contre une énumération des ordres et des orientations
+d'arrivée (scénario "tour" de verification.py), TourPlanner.costs contre
+des BFS d'état à état, et compression des commandes.
+Se lance avec pytest, ou directement : python test_tour.py
+"""
+import random
+
+import benchmark
+import robot
+import tour
+import verification
+
+SEEDS = range(300)
+
+
+def test_tours_are_legal_and_minimal():
+    for seed in SEEDS:
+        grid, query = verification.random_case(seed)
+        tables = robot.GridTables(grid)
+        error = verification.SCENARIOS["tour"](grid, tables, query, None)
+        assert error is None, (seed, error)
+
+
+def test_costs_match_state_distances():
+    rng = random.Random(3)
+    for _ in range(20):
+        grid = benchmark.generate_instance(12, 12, rng.randint(0, 30), rng)[2]
+        tables = robot.GridTables(grid)
+        points = verification.pick_vertices(rng, tables, 4)
+        if not points:
+            continue
+        start = (*points[0], rng.randrange(4))
+        goals = points[1:]
+        first, cost = tour.TourPlanner(grid, tables).costs(start, goals)
+        W = tables.W
+        nodes = [(i * W + j) * 4 + o for i, j in goals for o in range(4)]
+        s0 = (start[0] * W + start[1]) * 4 + start[2]
+        for row, s in [(first, s0)] + list(zip(cost, nodes)):
+            dist = verification.state_distances(tables, s)
+            expected = [tour.INF if dist[t] < 0 else dist[t] for t in nodes]
+            if s != s0 and first[nodes.index(s)] == tour.INF:
+                continue    # nœud inatteignable : ligne non calculée
+            assert row == expected, (start, goals, s)
+
+
+def test_compression_round_trip():
+    rng = random.Random(0)
+    for _ in range(50):
+        commands = [rng.choice(robot.COMMANDS) for _ in range(rng.randint(0, 30))]
+        runs = tour.compress_commands(commands)
+        assert tour.expand_commands(runs) == commands
+        assert all(a[0] != b[0] for a, b in zip(runs, runs[1:]))
+
+
+if __name__ == "__main__":
+    test_tours_are_legal_and_minimal()
+    test_costs_match_state_distances()
+    test_compression_round_trip()
+    print("ok")
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+import argparse
+import random
+import time
+
+import robot
+
+INF = float("inf")
+
+# Au-delà de ce nombre d'arrivées, l'ordre de visite est choisi par
+# l'heuristique (plus proche voisin + 2-opt) au lieu de la programmation
+# dynamique sur les sous-ensembles
+EXACT_LIMIT = 10
+
+
+def final_orientation(o, commands):
+    """Orientation du robot après la séquence commands, partie de l'orientation o."""
+    for cmd in commands:
+        if cmd == "G":
+            o = (o - 1) % 4
+        elif cmd == "D":
+            o = (o + 1) % 4
+    return o
+
+
+def compress_commands(commands):
+    """
+    Compression par plages d'une séquence de commandes : liste de
+    (commande, répétitions), p. ex. a3 a3 a3 D a1 -> [("a3", 3), ("D", 1), ("a1", 1)].
+    """
+    runs = []
+    for cmd in commands:
+        if runs and runs[-1][0] == cmd:
+            runs[-1][1] += 1
+        else:
+            runs.append([cmd, 1])
+    return [(cmd, n) for cmd, n in runs]
+
+
+def expand_commands(runs):
+    """Inverse de compress_commands."""
+    return [cmd for cmd, n in runs for _ in range(n)]
+
+
+def format_compressed(runs):
+    """Texte d'une séquence compressée : "a3x3 D a1" (xN omis pour une seule répétition)."""
+    return " ".join(cmd if n == 1 else f"{cmd}x{n}" for cmd, n in runs)
+
+
+class Tour:
+    """
+    Tournée calculée par plan_tour :
+      - order : indices des arrivées (dans la liste goals) dans l'ordre de visite,
+      - arrivals : orientation du robot à chaque arrivée,
+      - legs : séquence de commandes de chaque étape,
+      - commands : séquence complète (concaténation des étapes).
+    """
+
+    __slots__ = ("order", "arrivals", "legs")
+
+    def __init__(self, order, arrivals, legs):
+        self.order = order
+        self.arrivals = arrivals
+        self.legs = legs
+
+    @property
+    def commands(self):
+        return [cmd for leg in self.legs for cmd in leg]
+
+    def __len__(self):
+        return sum(len(leg) for leg in self.legs)
+
+
+class TourPlanner:
+    """
+    Coûts des étapes d'une tournée sur une grille. Un nœud est un état
+    (sommet, orientation) : l'orientation d'arrivée sur un point de
+    passage est celle du départ de l'étape suivante, et l'étape la moins
+    chère vers un point n'arrive pas forcément dans la meilleure
+    orientation pour repartir.
+
+    Chaque nœud fait un seul BFS (robot.DistanceField.from_start, avec les
+    4k états des points pour cibles), arrêté dès qu'ils sont tous
+    atteints : 4k + 1 recherches pour k points, dont on ne garde que la
+    ligne de coûts. Les commandes d'une étape retenue sont reconstruites
+    par leg, avec un BFS de plus arrêté sur son seul état d'arrivée.
+    """
+
+    def __init__(self, grid, tables=None):
+        self.tables = tables if tables is not None else robot.GridTables(grid)
+
+    def _row(self, state, nodes):
+        """Ligne de coûts de l'état (i, j, o) vers les états nodes (INF si inatteignable)."""
+        field = robot.DistanceField.from_start(self.tables, *state, targets=nodes)
+        return [INF if d < 0 else d for d in (field.distance_to(*node) for node in nodes)]
+
+    def costs(self, start, goals):
+        """
+        start = (i, j, o), goals = [(i, j), ...]. Retourne (first, cost) :
+        first[n] coût du départ vers le nœud n = 4 * g + o (arrivée g dans
+        l'orientation o), cost[n][m] coût du nœud n vers le nœud m.
+        """
+        tables = self.tables
+        nodes = [(i, j, o) for i, j in goals for o in range(4)]
+        si, sj, so = start
+        if not all(robot.endpoints_ok(tables, si, sj, i, j) for i, j in goals):
+            return [INF] * len(nodes), [[INF] * len(nodes) for _ in nodes]
+        first = self._row(start, nodes)
+        rows = {start: first}
+        cost = []
+        for n, node in enumerate(nodes):
+            if first[n] < INF:
+                if node not in rows:
+                    rows[node] = self._row(node, nodes)
+                cost.append(rows[node])
+            else:
+                # Nœud inatteignable depuis le départ : inutile de chercher
+                cost.append([INF] * len(nodes))
+        return first, cost
+
+    def leg(self, i, j, o, goal_i, goal_j, goal_o):
+        """
+        Commandes minimales de l'état (i, j, o) à l'état (goal_i, goal_j,
+        goal_o), ou None.
+        """
+        field = robot.DistanceField.from_start(self.tables, i, j, o,
+                                               targets=[(goal_i, goal_j, goal_o)])
+        return field.path_to(goal_i, goal_j, goal_o)
+
+
+def _chain(first, cost, order):
+    """
+    Meilleures orientations d'arrivée pour un ordre de visite fixé
+    (programmation dynamique le long de la chaîne). Retourne (coût, orientations).
+    """
+    best = [first[4 * order[0] + o] for o in range(4)]
+    back = []
+    for prev, g in zip(order, order[1:]):
+        nxt = [INF] * 4
+        arg = [0] * 4
+        for p in range(4):
+            if best[p] == INF:
+                continue
+            row = cost[4 * prev + p]
+            for o in range(4):
+                c = best[p] + row[4 * g + o]
+                if c < nxt[o]:
+                    nxt[o], arg[o] = c, p
+        back.append(arg)
+        best = nxt
+    o = min(range(4), key=best.__getitem__)
+    total = best[o]
+    arrivals = [o]
+    for arg in reversed(back):
+        o = arg[o]
+        arrivals.append(o)
+    arrivals.reverse()
+    return total, arrivals
+
+
+def _held_karp(first, cost, k):
+    """
+    Ordre de visite optimal de k points (programmation dynamique sur les
+    sous-ensembles, nœuds = (point, orientation)). Retourne (coût, ordre).
+    """
+    n_nodes = 4 * k
+    full = (1 << k) - 1
+    dp = [None] * (1 << k)
+    parent = [None] * (1 << k)
+    for g in range(k):
+        dp[1 << g] = [INF] * n_nodes
+        parent[1 << g] = [-1] * n_nodes
+        for o in range(4):
+            dp[1 << g][4 * g + o] = first[4 * g + o]
+
+    # Les masques sont parcourus par nombre de points croissant
+    for mask in sorted(range(1, full + 1), key=lambda m: bin(m).count("1")):
+        cur = dp[mask]
+        if cur is None:
+            continue
+        for n in range(n_nodes):
+            c = cur[n]
+            if c == INF:
+                continue
+            row = cost[n]
+            for g in range(k):
+                bit = 1 << g
+                if mask & bit:
+                    continue
+                m2 = mask | bit
+                if dp[m2] is None:
+                    dp[m2] = [INF] * n_nodes
+                    parent[m2] = [-1] * n_nodes
+                nd, par = dp[m2], parent[m2]
+                for m in range(4 * g, 4 * g + 4):
+                    c2 = c + row[m]
+                    if c2 < nd[m]:
+                        nd[m] = c2
+                        par[m] = n
+
+    if dp[full] is None:
+        return INF, None
+    last = min(range(n_nodes), key=dp[full].__getitem__)
+    total = dp[full][last]
+    if total == INF:
+        return INF, None
+    order = []
+    mask = full
+    while last >= 0:
+        order.append(last // 4)
+        last, mask = parent[mask][last], mask ^ (1 << (last // 4))
+    order.reverse()
+    return total, order
+
+
+def _nearest_neighbor(first, cost, k):
+    """Ordre glouton : chaque étape va vers le nœud le moins cher non visité."""
+    left = set(range(k))
+    row = first
+    order = []
+    while left:
+        m = min((m for g in left for m in range(4 * g, 4 * g + 4)), key=row.__getitem__)
+        if row[m] == INF:
+            return None
+        order.append(m // 4)
+        left.discard(m // 4)
+        row = cost[m]
+    return order
+
+
+def _two_opt(first, cost, order):
+    """
+    Amélioration 2-opt d'un ordre : on inverse des segments tant que le
+    coût (orientations optimisées par _chain) diminue. Les coûts n'étant
+    pas symétriques, chaque candidat est réévalué entièrement.
+    """
+    best, _ = _chain(first, cost, order)
+    improved = True
+    while improved:
+        improved = False
+        for a in range(len(order) - 1):
+            for b in range(a + 1, len(order)):
+                cand = order[:a] + order[a:b + 1][::-1] + order[b + 1:]
+                c, _ = _chain(first, cost, cand)
+                if c < best:
+                    order, best, improved = cand, c, True
+    return best, order
+
+
+def plan_tour(grid, start, goals, ordered=False, exact_limit=EXACT_LIMIT, tables=None):
+    """
+    Tournée du robot depuis l'état start = (i, j, orientation) passant par
+    tous les sommets goals = [(i, j), ...], dans l'ordre donné (ordered)
+    ou dans l'ordre qui minimise le nombre total de commandes : exact
+    jusqu'à exact_limit points, heuristique au-delà. L'orientation
+    d'arrivée de chaque étape est choisie pour minimiser le total.
+    Retourne un Tour, ou None si un point n'est pas atteignable.
+    """
+    start = (start[0], start[1], robot.ORI_STR_TO_ID.get(start[2], start[2]))
+    if not goals:
+        return Tour([], [], [])
+    planner = TourPlanner(grid, tables)
+    first, cost = planner.costs(start, goals)
+    k = len(goals)
+
+    if ordered:
+        order = list(range(k))
+    elif k <= exact_limit:
+        _, order = _held_karp(first, cost, k)
+    else:
+        order = _nearest_neighbor(first, cost, k)
+        if order is not None:
+            _, order = _two_opt(first, cost, order)
+    if order is None:
+        return None
+    total, arrivals = _chain(first, cost, order)
+    if total == INF:
+        return None
+
+    legs = []
+    i, j, o = start
+    for g, o2 in zip(order, arrivals):
+        gi, gj = goals[g]
+        legs.append(planner.leg(i, j, o, gi, gj, o2))
+        i, j, o = gi, gj, o2
+    return Tour(order, arrivals, legs)
+
+
+def naive_tour(grid, start, goals):
+    """
+    Tournée dans l'ordre donné en enchaînant des appels à robot.bfs, chaque
+    étape repartant de l'orientation d'arrivée de la précédente (pour
+    comparaison). Retourne la séquence de commandes, ou None.
+    """
+    i, j, o = start[0], start[1], robot.ORI_STR_TO_ID.get(start[2], start[2])
+    commands = []
+    for gi, gj in goals:
+        leg = robot.bfs(grid, i, j, o, gi, gj)
+        if leg is None:
+            return None
+        commands += leg
+        i, j, o = gi, gj, final_orientation(o, leg)
+    return commands
+
+
+def random_waypoints(rng, grid, k):
+    """k sommets valides distincts tirés au hasard (moins s'il n'y en a pas assez)."""
+    M, N = len(grid), len(grid[0])
+    ok = [(i, j) for i in range(M + 1) for j in range(N + 1) if robot.vertex_ok(i, j, grid)]
+    return rng.sample(ok, min(k, len(ok)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Tournée du robot par plusieurs points, comparée aux appels successifs à bfs.")
+    parser.add_argument("--size", type=int, default=40, help="taille N de la grille N x N")
+    parser.add_argument("--density", type=float, default=0.1, help="proportion d'obstacles")
+    parser.add_argument("--goals", type=int, default=8, help="nombre de points à visiter")
+    parser.add_argument("--ordered", action="store_true", help="visite dans l'ordre tiré")
+    parser.add_argument("--exact-limit", type=int, default=EXACT_LIMIT,
+                        help="nombre maximal de points pour l'ordre exact")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    size = args.size
+    grid = [[1 if rng.random() < args.density else 0 for _ in range(size)] for _ in range(size)]
+    points = random_waypoints(rng, grid, args.goals + 1)
+    start = (*points[0], rng.randrange(4))
+    goals = points[1:]
+
+    t0 = time.perf_counter()
+    naive = naive_tour(grid, start, goals)
+    t_naive = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    tour = plan_tour(grid, start, goals, ordered=args.ordered, exact_limit=args.exact_limit)
+    t_tour = time.perf_counter() - t0
+
+    print(f"grille {size}x{size}, départ {start}, {len(goals)} points")
+    print(f"bfs successifs : {len(naive) if naive is not None else -1} commandes "
+          f"({t_naive * 1000:.1f} ms)")
+    if tour is None:
+        print("tournée : -1")
+        return
+    print(f"tournée        : {len(tour)} commandes ({t_tour * 1000:.1f} ms), "
+          f"ordre {tour.order}")
+    print(format_compressed(compress_commands(tour.commands)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import random
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import hierarchical
+import incremental
+import robot
+import tour
+
+
+class IllegalMove(ValueError):
+    """Commande impossible lors de la simulation (cf. simulate)."""
+
+
+def simulate(grid, start_i, start_j, start_o, commands):
+    """
+    Rejoue une séquence de commandes G / D / a1 / a2 / a3 depuis l'état
+    (start_i, start_j, start_o) avec les règles de robot.bfs (sommets dans
+    [0..M] x [0..N], rails libres selon edge_ok, sommets dégagés selon
+    vertex_ok). Retourne l'état final (i, j, o) ; lève IllegalMove à la
+    première commande impossible.
+    """
+    M, N = len(grid), len(grid[0])
+    i, j, o = start_i, start_j, start_o
+    if not (0 <= i <= M and 0 <= j <= N) or not robot.vertex_ok(i, j, grid):
+        raise IllegalMove(f"sommet de départ ({i}, {j}) non valide")
+
+    for k, cmd in enumerate(commands):
+        if cmd == "G":
+            o = (o - 1) % 4
+        elif cmd == "D":
+            o = (o + 1) % 4
+        elif cmd in ("a1", "a2", "a3"):
+            di, dj = robot.DIRS[o]
+            for _ in range(int(cmd[1])):
+                ni, nj = i + di, j + dj
+                if not (0 <= ni <= M and 0 <= nj <= N):
+                    raise IllegalMove(f"commande {k} ({cmd}) : sortie de la grille en ({ni}, {nj})")
+                if not robot.edge_ok(i, j, di, dj, grid):
+                    raise IllegalMove(f"commande {k} ({cmd}) : rail bloqué depuis ({i}, {j})")
+                if not robot.vertex_ok(ni, nj, grid):
+                    raise IllegalMove(f"commande {k} ({cmd}) : sommet ({ni}, {nj}) non dégagé")
+                i, j = ni, nj
+        else:
+            raise IllegalMove(f"commande {k} inconnue : {cmd!r}")
+    return i, j, o
+
+
+def check_result(grid, query, result, reference, optimal=True):
+    """
+    Compare le résultat d'un moteur à celui de robot.bfs (reference, liste
+    ou None) pour query = (D1, D2, o, F1, F2). result est une séquence de
+    commandes (ou None), ou un entier T (-1 si pas de chemin) pour un moteur
+    de distance seule. Retourne un message d'erreur, ou None si le résultat
+    est correct : même existence, même longueur (au moins la même longueur
+    si optimal est faux), séquence légale terminant sur le sommet d'arrivée.
+    """
+    D1, D2, o, F1, F2 = query
+    if isinstance(result, int):
+        expected = -1 if reference is None else len(reference)
+        if result != expected:
+            return f"T = {result}, attendu {expected}"
+        return None
+    if (result is None) != (reference is None):
+        return f"existence : {result is not None}, attendu {reference is not None}"
+    if result is None:
+        return None
+    if len(result) < len(reference) or (optimal and len(result) != len(reference)):
+        return f"longueur {len(result)}, attendu {len(reference)} (non optimal)"
+    try:
+        i, j, _ = simulate(grid, D1, D2, o, result)
+    except IllegalMove as e:
+        return f"séquence illégale : {e}"
+    if (i, j) != (F1, F2):
+        return f"arrivée en ({i}, {j}), attendu ({F1}, {F2})"
+    return None
+
+
+def _field_engine(tables, D1, D2, o, F1, F2):
+    return robot.DistanceField.from_start(tables, D1, D2, o, [(F1, F2)]).path_to(F1, F2)
+
+
+def _field_reverse_engine(tables, D1, D2, o, F1, F2):
+    return robot.DistanceField.to_goal(tables, F1, F2, [(D1, D2, o)]).path_from(D1, D2, o)
+
+
+def _block_size(tables):
+    """Taille de bloc de HierarchicalPlanner pour une grille de test (3 à 6 selon M, N)."""
+    return 3 + (tables.M + tables.N) % 4
+
+
+def _hierarchical_engine(tables, D1, D2, o, F1, F2):
+    planner = hierarchical.HierarchicalPlanner(None, K=_block_size(tables), tables=tables)
+    return planner.plan(D1, D2, o, F1, F2)
+
+
+# Moteurs vérifiés : nom -> fonction (tables, D1, D2, o, F1, F2)
+ENGINES = dict(robot.ENGINES)
+ENGINES.update({
+    "field": _field_engine,
+    "field_reverse": _field_reverse_engine,
+    "distance": robot.bfs_distance,
+    "hierarchical": _hierarchical_engine,
+})
+
+
+def valid_vertices(tables):
+    """Sommets valides (i, j) de la grille, dans l'ordre des rangées."""
+    W = tables.W
+    return [(v // W, v % W) for v, ok in enumerate(tables.vertex) if ok]
+
+
+def pick_vertices(rng, tables, k, near=None):
+    """
+    k sommets valides tirés par rng (avec remise), de préférence dans la
+    composante de near = (i, j) s'il est donné ; [] si la grille n'en a pas.
+    """
+    vertices = valid_vertices(tables)
+    if near is not None and rng.random() < 0.85:
+        same = [(i, j) for i, j in vertices if tables.connected(near[0], near[1], i, j)]
+        vertices = same or vertices
+    return [rng.choice(vertices) for _ in range(k)] if vertices else []
+
+
+def random_case(seed):
+    """
+    Instance (grid, (D1, D2, o, F1, F2)) tirée de façon reproductible par
+    seed, sur une grille d'au plus 24 x 24. Le plus souvent, départ et
+    arrivée sont des sommets valides, en général de la même composante :
+    avec des sommets quelconques, la plupart des instances se
+    réduiraient à -1. Les autres instances gardent des extrémités
+    quelconques, parfois hors de la grille.
+    """
+    rng = random.Random(seed)
+    size = rng.choice((4, 8, 16, 24))
+    M, N = rng.randint(1 + size // 4, size), rng.randint(1 + size // 4, size)
+    density = rng.choice((0.0, 0.05, 0.1, 0.15, 0.25, 0.35))
+    grid = [[1 if rng.random() < density else 0 for _ in range(N)] for _ in range(M)]
+    tables = robot.GridTables(grid)
+    kind = rng.random()
+    picked = pick_vertices(rng, tables, 1) if kind < 0.8 else []
+    if picked:
+        # Arrivée : la plus éloignée (à vol d'oiseau) de quelques candidates
+        start = picked[0]
+        goal = max(pick_vertices(rng, tables, 3, near=start),
+                   key=lambda v: abs(v[0] - start[0]) + abs(v[1] - start[1]))
+    else:
+        low, high = (-1, 1) if kind > 0.95 else (0, 0)
+        start = (rng.randint(low, M + high), rng.randint(low, N + high))
+        goal = (rng.randint(low, M + high), rng.randint(low, N + high))
+    return grid, (start[0], start[1], rng.randrange(4), goal[0], goal[1])
+
+
+def scenario_rng(grid, query):
+    """Générateur propre à l'instance, pour que les scénarios soient reproductibles (et réductibles)."""
+    return random.Random(repr((len(grid), len(grid[0]), query)))
+
+
+def reference_length(tables, D1, D2, o, F1, F2):
+    """
+    Longueur de référence (-1 si pas de chemin) des scénarios à plusieurs
+    requêtes : bfs_fast, lui-même vérifié contre robot.bfs (moteur "bfs").
+    """
+    cmds = robot.bfs_fast(tables, D1, D2, o, F1, F2)
+    return -1 if cmds is None else len(cmds)
+
+
+def check_lines(grid, tables, queries, lines):
+    """Compare des lignes de sortie de robot.py aux requêtes (D1, D2, o, F1, F2)."""
+    for q, line in zip(queries, lines):
+        cmds = None if line == "-1" else line.split()[1:]
+        if line != "-1" and int(line.split()[0]) != len(cmds):
+            return f"{q} : ligne incohérente {line!r}"
+        error = check_result(grid, q, cmds, robot.bfs_fast(tables, *q))
+        if error is not None:
+            return f"{q} : {error}"
+    if len(lines) != len(queries):
+        return f"{len(lines)} lignes pour {len(queries)} requêtes"
+    return None
+
+
+def _hierarchical_fast(grid, tables, query, reference):
+    planner = hierarchical.HierarchicalPlanner(None, K=_block_size(tables), tables=tables)
+    return check_result(grid, query, planner.plan(*query, exact=False), reference, optimal=False)
+
+
+def _incremental(grid, tables, query, reference):
+    """LPA* : plan initial, puis après chaque case basculée, contre un BFS sur la grille courante."""
+    D1, D2, o, F1, F2 = query
+    rng = scenario_rng(grid, query)
+    planner = incremental.IncrementalPlanner(grid, D1, D2, o, F1, F2)
+    error = check_result(grid, query, planner.plan(), reference)
+    # Cases basculées autour du segment départ-arrivée, où elles changent
+    # le plus souvent le chemin
+    M, N = len(grid), len(grid[0])
+    rows = (max(0, min(D1, F1) - 2), min(M - 1, max(D1, F1) + 1))
+    cols = (max(0, min(D2, F2) - 2), min(N - 1, max(D2, F2) + 1))
+    for k in range(6):
+        if error is not None:
+            return f"après {k} bascules : {error}"
+        if rows[0] > rows[1] or cols[0] > cols[1]:
+            return None
+        r, c = rng.randint(*rows), rng.randint(*cols)
+        result = planner.toggle(r, c)
+        current = [list(row) for row in planner.grid]
+        error = check_result(current, query, result, robot.bfs(current, D1, D2, o, F1, F2))
+    return None if error is None else f"après 6 bascules : {error}"
+
+
+def batch_queries(grid, tables, query):
+    """
+    Requêtes d'un lot autour de query : elle-même, des arrivées depuis le
+    même départ, des départs vers la même arrivée (champs partagés de
+    plan_batch), et un doublon.
+    """
+    rng = scenario_rng(grid, query)
+    D1, D2, o, F1, F2 = query
+    queries = [query]
+    for i, j in pick_vertices(rng, tables, 3, near=(D1, D2)):
+        queries.append((D1, D2, o, i, j))
+    for i, j in pick_vertices(rng, tables, 3, near=(F1, F2)):
+        queries.append((i, j, rng.randrange(4), F1, F2))
+    queries.append(query)
+    return queries
+
+
+def _plan_batch(grid, tables, query, reference):
+    queries = batch_queries(grid, tables, query)
+    batch = [(D1, D2, F1, F2, robot.ORI_ID_TO_STR[o]) for D1, D2, o, F1, F2 in queries]
+    results, _ = robot.plan_batch(grid, batch)
+    for q, result in zip(queries, results):
+        error = check_result(grid, q, result, robot.bfs_fast(tables, *q))
+        if error is not None:
+            return f"{q} : {error}"
+    distances, _ = robot.plan_batch(grid, batch, distance_only=True)
+    for q, d in zip(queries, distances):
+        if d != reference_length(tables, *q):
+            return f"{q} (distance seule) : T = {d}, attendu {reference_length(tables, *q)}"
+    return None
+
+
+def _solve_grouped(grid, tables, query, reference):
+    """solve sur des instances de deux grilles entremêlées (regroupées par grille)."""
+    other = [list(row) for row in grid]
+    if other and other[0]:
+        other[0][0] ^= 1
+    queries = batch_queries(grid, tables, query)
+    instances = []
+    for k, (D1, D2, o, F1, F2) in enumerate(queries):
+        g = grid if k % 2 == 0 else other
+        instances.append((len(g), len(g[0]), g, D1, D2, F1, F2, robot.ORI_ID_TO_STR[o]))
+    lines = robot.solve(instances)
+    for g, parity in ((grid, 0), (other, 1)):
+        error = check_lines(g, robot.GridTables(g), queries[parity::2], lines[parity::2])
+        if error is not None:
+            return error
+    return None
+
+
+def _cost_matrix(grid, tables, query, reference):
+    D1, D2, o, F1, F2 = query
+    if not (robot.endpoints_ok(tables, D1, D2, D1, D2) and robot.endpoints_ok(tables, F1, F2, F1, F2)):
+        return None
+    rng = scenario_rng(grid, query)
+    vertices = [(D1, D2), (F1, F2)] + pick_vertices(rng, tables, 2, near=(D1, D2))
+    for orientation in (None, o):
+        cost = robot.cost_matrix(tables, vertices, orientation)
+        for a, (i, j) in enumerate(vertices):
+            for b, (gi, gj) in enumerate(vertices):
+                ds = [reference_length(tables, i, j, o2, gi, gj)
+                      for o2 in (range(4) if orientation is None else (orientation,))]
+                ds = [d for d in ds if d >= 0]
+                expected = min(ds) if ds else -1
+                if cost[a][b] != expected:
+                    return (f"orientation {orientation}, {(i, j)} -> {(gi, gj)} : "
+                            f"{cost[a][b]}, attendu {expected}")
+    return None
+
+
+def state_distances(tables, s0):
+    """Distances de l'état s0 à tous les états (BFS de référence sur GridTables ; -1 si inatteignable)."""
+    dist = [-1] * ((tables.M + 1) * tables.W * 4)
+    dist[s0] = 0
+    step4 = [4 * d for d in tables.step]
+    q = deque([s0])
+    while q:
+        s = q.popleft()
+        o = s & 3
+        succ = [s - o + ((o - 1) & 3), s - o + ((o + 1) & 3)]
+        succ += [s + n * step4[o] for n in range(1, tables.reach[s] + 1)]
+        for s2 in succ:
+            if dist[s2] < 0:
+                dist[s2] = dist[s] + 1
+                q.append(s2)
+    return dist
+
+
+def _tour(grid, tables, query, reference):
+    """
+    plan_tour par l'arrivée de query et un autre sommet, dans l'ordre donné
+    puis dans le meilleur ordre : étapes légales, orientations d'arrivée
+    annoncées, et longueur totale minimale (toutes les orientations
+    d'arrivée et, sans ordre imposé, les deux ordres énumérés).
+    """
+    D1, D2, o, F1, F2 = query
+    if not robot.endpoints_ok(tables, D1, D2, F1, F2):
+        return None
+    rng = scenario_rng(grid, query)
+    goals = [(F1, F2)] + pick_vertices(rng, tables, 1, near=(D1, D2))
+    W = tables.W
+    start = (D1 * W + D2) * 4 + o
+    dist = {start: state_distances(tables, start)}
+    for i, j in goals:
+        for o2 in range(4):
+            s = (i * W + j) * 4 + o2
+            if s not in dist:
+                dist[s] = state_distances(tables, s)
+
+    def best(order):
+        # Plus courte chaîne d'états visitant order, orientations libres
+        costs = {start: 0}
+        for i, j in order:
+            nxt = {}
+            for s, c in costs.items():
+                for o2 in range(4):
+                    t = (i * W + j) * 4 + o2
+                    d = dist[s][t]
+                    if d >= 0 and (t not in nxt or c + d < nxt[t]):
+                        nxt[t] = c + d
+            costs = nxt
+        return min(costs.values()) if costs else -1
+
+    for ordered in (True, False):
+        result = tour.plan_tour(grid, (D1, D2, o), goals, ordered=ordered, tables=tables)
+        if ordered:
+            expected = best(goals)
+        else:
+            lengths = [d for d in (best(goals), best(goals[::-1])) if d >= 0]
+            expected = min(lengths) if lengths else -1
+        if result is None:
+            if expected >= 0:
+                return f"ordered={ordered} : pas de tournée, attendu {expected}"
+            continue
+        if len(result) != expected:
+            return f"ordered={ordered} : {len(result)} commandes, attendu {expected}"
+        i, j, o2 = D1, D2, o
+        for g, arrival, leg in zip(result.order, result.arrivals, result.legs):
+            try:
+                i, j, o2 = simulate(grid, i, j, o2, leg)
+            except IllegalMove as e:
+                return f"ordered={ordered} : étape illégale : {e}"
+            if (i, j, o2) != (*goals[g], arrival):
+                return f"ordered={ordered} : étape terminée en {(i, j, o2)}, attendu {(*goals[g], arrival)}"
+    return None
+
+
+# Scénarios vérifiés : nom -> fonction (grid, tables, query, reference)
+# retournant un message d'erreur ou None ; ils reprennent l'instance de
+# random_case avec des requêtes ou des bascules tirées par scenario_rng
+SCENARIOS = {
+    "hierarchical_fast": _hierarchical_fast,
+    "incremental": _incremental,
+    "plan_batch": _plan_batch,
+    "solve_grouped": _solve_grouped,
+    "cost_matrix": _cost_matrix,
+    "tour": _tour,
+}
+
+
+def failures(grid, query, engines):
+    """Liste des (moteur, message) en échec sur une instance."""
+    D1, D2, o, F1, F2 = query
+    reference = robot.bfs(grid, D1, D2, o, F1, F2)
+    tables = robot.GridTables(grid)
+    out = []
+    for name in engines:
+        try:
+            if name in SCENARIOS:
+                error = SCENARIOS[name](grid, tables, query, reference)
+            else:
+                result = ENGINES[name](tables, D1, D2, o, F1, F2)
+                error = check_result(grid, query, result, reference)
+        except Exception as e:      # un plantage est aussi un échec
+            error = f"exception {type(e).__name__} : {e}"
+        if error is not None:
+            out.append((name, error))
+    return out
+
+
+def _check_seed(args):
+    seed, engines = args
+    grid, query = random_case(seed)
+    return seed, failures(grid, query, engines)
+
+
+def differential(seeds, engines, workers=1):
+    """
+    Vérifie les moteurs sur les instances random_case(seed) ; workers > 1
+    répartit les graines sur des processus. Produit (seed, échecs) pour
+    chaque instance en échec, dans l'ordre des graines.
+    """
+    jobs = ((seed, engines) for seed in seeds)
+    if workers == 1:
+        results = map(_check_seed, jobs)
+        for seed, fails in results:
+            if fails:
+                yield seed, fails
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for seed, fails in executor.map(_check_seed, jobs, chunksize=64):
+            if fails:
+                yield seed, fails
+
+
+def shrink(grid, query, engine):
+    """
+    Réduit une instance en échec pour engine à un contre-exemple minimal :
+    on retire des rangées / colonnes de bord et on libère des cases tant
+    que l'échec persiste. Retourne (grid, query) réduits.
+    """
+    def fails(g, q):
+        return any(name == engine for name, _ in failures(g, q, [engine]))
+
+    grid = [list(row) for row in grid]
+    changed = True
+    while changed:
+        changed = False
+        # Rangées / colonnes de bord (les coordonnées suivent)
+        for cut in ("haut", "bas", "gauche", "droite"):
+            M, N = len(grid), len(grid[0])
+            D1, D2, o, F1, F2 = query
+            if cut in ("haut", "bas") and M > 1:
+                if cut == "haut":
+                    g = grid[1:]
+                    q = (D1 - 1, D2, o, F1 - 1, F2)
+                else:
+                    g = grid[:-1]
+                    q = query
+            elif cut in ("gauche", "droite") and N > 1:
+                if cut == "gauche":
+                    g = [row[1:] for row in grid]
+                    q = (D1, D2 - 1, o, F1, F2 - 1)
+                else:
+                    g = [row[:-1] for row in grid]
+                    q = query
+            else:
+                continue
+            Mg, Ng = len(g), len(g[0])
+            if not (0 <= q[0] <= Mg and 0 <= q[1] <= Ng and 0 <= q[3] <= Mg and 0 <= q[4] <= Ng):
+                continue
+            if fails(g, q):
+                grid, query, changed = g, q, True
+        # Obstacles retirés un par un
+        for r in range(len(grid)):
+            for c in range(len(grid[0])):
+                if grid[r][c]:
+                    grid[r][c] = 0
+                    if fails(grid, query):
+                        changed = True
+                    else:
+                        grid[r][c] = 1
+    return grid, query
+
+
+def format_case(grid, query):
+    """Instance au format d'entrée de robot.py (pour la rejouer)."""
+    D1, D2, o, F1, F2 = query
+    lines = [f"{len(grid)} {len(grid[0])}"]
+    lines += [" ".join(str(c) for c in row) for row in grid]
+    lines.append(f"{D1} {D2} {F1} {F2} {robot.ORI_ID_TO_STR[o]}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Test différentiel des moteurs contre robot.bfs (longueur, légalité, arrivée).")
+    parser.add_argument("--count", type=int, default=2000, help="nombre d'instances")
+    parser.add_argument("--seed", type=int, default=0, help="première graine")
+    checks = sorted(ENGINES) + sorted(SCENARIOS)
+    parser.add_argument("--engines", nargs="+", default=checks, choices=checks,
+                        help="moteurs et scénarios vérifiés (défaut : tous)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="nombre de processus (0 : un par cœur)")
+    parser.add_argument("--no-shrink", action="store_true",
+                        help="n'essaie pas de réduire les contre-exemples")
+    parser.add_argument("--max-failures", type=int, default=5,
+                        help="nombre de contre-exemples affichés")
+    args = parser.parse_args(argv)
+
+    workers = args.workers or os.cpu_count() or 1
+    seeds = range(args.seed, args.seed + args.count)
+    n_failed = 0
+    for seed, fails in differential(seeds, args.engines, workers):
+        n_failed += 1
+        if n_failed > args.max_failures:
+            continue
+        grid, query = random_case(seed)
+        for name, error in fails:
+            print(f"graine {seed}, moteur {name} : {error}")
+        if not args.no_shrink:
+            grid, query = shrink(grid, query, fails[0][0])
+            print(f"contre-exemple réduit ({fails[0][0]}) :")
+        print(format_case(grid, query) + "\n0 0\n")
+
+    print(f"{args.count} instances, {n_failed} en échec ({', '.join(args.engines)})")
+    return 1 if n_failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())